@@ -1,8 +1,68 @@
 import itertools
+import weakref
+
+# Functions compiled from sentences, by their Python source, holding
+# at most COMPILED_CAPACITY of them with the oldest dropped first
+compiled = {}
+COMPILED_CAPACITY = 256
+
+# Frozen sentences by their parts, so each is only built once while it
+# is in use
+interned = weakref.WeakValueDictionary()
+
+# Bumped whenever an And is added to. Ands keep their hash and symbols
+# along with the count they were worked out at, so those of every And
+# that might contain the changed one are known to be out of date.
+mutations = 0
+
+# Most ifs nested in a compiled sentence, well below the most levels of
+# indentation Python accepts
+NESTING_LIMIT = 50
+
+# Most symbols for which model_check enumerates models by default
+# rather than calling the SAT solver
+ENUMERATION_LIMIT = 12
 
 
 class Sentence():
 
+    # Whether the sentence can never change. Only an And can be added to,
+    # so every sentence without one inside it is frozen.
+    frozen = True
+
+    def __hash__(self):
+        if self.frozen:
+            return self.hash_value
+        return self.summary()[0]
+
+    def intern(self):
+        """
+        Returns the sentence to use for a newly built one: if it is frozen,
+        any live sentence equal to it, and otherwise itself.
+
+        Equal frozen sentences are therefore one object, compared by
+        identity, and their hash and symbols are only worked out once.
+        """
+        parts = self.parts()
+        self.frozen = all(part.frozen for part in parts)
+        if not self.frozen:
+            return self
+        key = self.key()
+        sentence = interned.get(key)
+        if sentence is None:
+            self.hash_value = hash(key)
+            self.symbol_set = frozenset().union(*[part.symbols() for part in parts])
+            sentence = interned.setdefault(key, self)
+        return sentence
+
+    def key(self):
+        """Returns a tuple identifying the logical sentence."""
+        raise Exception("nothing to identify")
+
+    def parts(self):
+        """Returns the sentences the logical sentence is made of."""
+        return ()
+
     def evaluate(self, model):
         """Evaluates the logical sentence."""
         raise Exception("nothing to evaluate")
@@ -13,7 +73,78 @@ class Sentence():
 
     def symbols(self):
         """Returns a set of all symbols in the logical sentence."""
-        return set()
+        if self.frozen:
+            return set(self.symbol_set)
+        return set(self.summary()[1])
+
+    def stored(self):
+        """
+        Returns the hash and symbols kept by the sentence, or None if
+        they have to be worked out from its parts.
+        """
+        if self.frozen:
+            return self.hash_value, self.symbol_set
+        return None
+
+    def store(self, summary):
+        """Keeps the hash and symbols of the sentence, if it can."""
+
+    def summary(self):
+        """
+        Returns the hash and symbols of the sentence.
+
+        Both come from one pass over the sentences inside it that don't
+        keep their own, each visited once, so nested sentences that can
+        change take time linear in their size rather than recomputing
+        the parts for the hash and again for the symbols at every level.
+        """
+        summary = self.stored()
+        if summary is not None:
+            return summary
+        found = {}
+        stack = [(self, False)]
+        while stack:
+            sentence, expanded = stack.pop()
+            if id(sentence) in found:
+                continue
+            summary = sentence.stored()
+            if summary is None:
+                parts = sentence.parts()
+                if not expanded:
+                    stack.append((sentence, True))
+                    stack.extend((part, False) for part in parts)
+                    continue
+                summaries = [found[id(part)] for part in parts]
+                summary = (hash((sentence.key()[0], tuple(h for h, _ in summaries))),
+                           frozenset().union(*[symbols for _, symbols in summaries]))
+                sentence.store(summary)
+            found[id(sentence)] = summary
+        return found[id(self)]
+
+    def expression(self, operands, slots):
+        """
+        Returns Python source for the sentence's value in a model given as
+        an integer m, where symbol name has bit slots[name], given the
+        sources of its parts' values in `operands`.
+        """
+        raise Exception("nothing to compile")
+
+    def compile(self, symbols=None):
+        """
+        Returns a function evaluating the sentence in a model given as an
+        integer, where the ith of `symbols` is true when bit i is set.
+
+        Symbols default to those of the sentence in sorted order. Sentences
+        that compile to the same source share one function.
+        """
+        if symbols is None:
+            symbols = sorted(self.symbols())
+        slots = {name: i for i, name in enumerate(symbols)}
+        missing = self.symbols() - slots.keys()
+        if missing:
+            raise Exception(f"variable {min(missing)} not in symbols")
+        lines, result = short_circuit(self, slots)
+        return compile_function("m", lines, f"bool({result})")
 
     @classmethod
     def validate(cls, sentence):
@@ -42,16 +173,61 @@ class Sentence():
             return f"({s})"
 
 
+class Constant(Sentence):
+
+    def __new__(cls, value):
+        sentence = super().__new__(cls)
+        sentence.value = bool(value)
+        return sentence.intern()
+
+    # Sentences are pickled as the arguments to build them again, so an
+    # unpickled one is interned in its new process, and no hash from the
+    # old process, where strings hash differently, is restored onto it
+    def __reduce__(self):
+        return (type(self), (self.value,))
+
+    def __eq__(self, other):
+        return self is other
+
+    __hash__ = Sentence.__hash__
+
+    def __repr__(self):
+        return "TRUE" if self.value else "FALSE"
+
+    def key(self):
+        return ("constant", self.value)
+
+    def evaluate(self, model):
+        return self.value
+
+    def formula(self):
+        return str(self.value)
+
+    def expression(self, operands, slots):
+        return str(self.value)
+
+
+TRUE = Constant(True)
+FALSE = Constant(False)
+
+
 class Symbol(Sentence):
 
-    def __init__(self, name):
-        self.name = name
+    def __new__(cls, name):
+        sentence = super().__new__(cls)
+        sentence.name = name
+        return sentence.intern()
+
+    def __reduce__(self):
+        return (type(self), (self.name,))
 
     def __eq__(self, other):
-        return isinstance(other, Symbol) and self.name == other.name
+        return self is other
 
-    def __hash__(self):
-        return hash(("symbol", self.name))
+    __hash__ = Sentence.__hash__
+
+    def key(self):
+        return ("symbol", self.name)
 
     def __repr__(self):
         return self.name
@@ -68,17 +244,36 @@ class Symbol(Sentence):
     def symbols(self):
         return {self.name}
 
+    def stored(self):
+        return self.hash_value, frozenset((self.name,))
+
+    def expression(self, operands, slots):
+        return f"m >> {slots[self.name]} & 1"
+
 
 class Not(Sentence):
-    def __init__(self, operand):
+    def __new__(cls, operand):
         Sentence.validate(operand)
-        self.operand = operand
+        sentence = super().__new__(cls)
+        sentence.operand = operand
+        return sentence.intern()
+
+    def __reduce__(self):
+        return (type(self), (self.operand,))
 
     def __eq__(self, other):
-        return isinstance(other, Not) and self.operand == other.operand
+        return self is other or (
+            not self.frozen and isinstance(other, Not)
+            and self.operand == other.operand
+        )
 
-    def __hash__(self):
-        return hash(("not", hash(self.operand)))
+    __hash__ = Sentence.__hash__
+
+    def key(self):
+        return ("not", self.operand)
+
+    def parts(self):
+        return (self.operand,)
 
     def __repr__(self):
         return f"Not({self.operand})"
@@ -89,23 +284,28 @@ class Not(Sentence):
     def formula(self):
         return "¬" + Sentence.parenthesize(self.operand.formula())
 
-    def symbols(self):
-        return self.operand.symbols()
+    def expression(self, operands, slots):
+        return f"not {operands[0]}"
 
 
 class And(Sentence):
+
+    # Conjuncts can be added, so an And is never frozen or interned
+    frozen = False
+
     def __init__(self, *conjuncts):
         for conjunct in conjuncts:
             Sentence.validate(conjunct)
         self.conjuncts = list(conjuncts)
+        self.cache = None
+
+    def __reduce__(self):
+        return (type(self), tuple(self.conjuncts))
 
     def __eq__(self, other):
         return isinstance(other, And) and self.conjuncts == other.conjuncts
 
-    def __hash__(self):
-        return hash(
-            ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
-        )
+    __hash__ = Sentence.__hash__
 
     def __repr__(self):
         conjunctions = ", ".join(
@@ -114,8 +314,26 @@ class And(Sentence):
         return f"And({conjunctions})"
 
     def add(self, conjunct):
+        global mutations
         Sentence.validate(conjunct)
         self.conjuncts.append(conjunct)
+        mutations += 1
+
+    def stored(self):
+        # The hash and symbols are kept until any And is added to, which
+        # could be this one or one inside it
+        if self.cache is not None and self.cache[0] == mutations:
+            return self.cache[1]
+        return None
+
+    def store(self, summary):
+        self.cache = (mutations, summary)
+
+    def key(self):
+        return ("and", tuple(self.conjuncts))
+
+    def parts(self):
+        return tuple(self.conjuncts)
 
     def evaluate(self, model):
         return all(conjunct.evaluate(model) for conjunct in self.conjuncts)
@@ -126,24 +344,35 @@ class And(Sentence):
         return " ∧ ".join([Sentence.parenthesize(conjunct.formula())
                            for conjunct in self.conjuncts])
 
-    def symbols(self):
-        return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
+    def expression(self, operands, slots):
+        return " and ".join(operands) or "True"
 
 
 class Or(Sentence):
-    def __init__(self, *disjuncts):
+    def __new__(cls, *disjuncts):
         for disjunct in disjuncts:
             Sentence.validate(disjunct)
-        self.disjuncts = list(disjuncts)
+        sentence = super().__new__(cls)
+        sentence.disjuncts = list(disjuncts)
+        return sentence.intern()
 
-    def __eq__(self, other):
-        return isinstance(other, Or) and self.disjuncts == other.disjuncts
+    def __reduce__(self):
+        return (type(self), tuple(self.disjuncts))
 
-    def __hash__(self):
-        return hash(
-            ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
+    def __eq__(self, other):
+        return self is other or (
+            not self.frozen and isinstance(other, Or)
+            and self.disjuncts == other.disjuncts
         )
 
+    __hash__ = Sentence.__hash__
+
+    def key(self):
+        return ("or", tuple(self.disjuncts))
+
+    def parts(self):
+        return tuple(self.disjuncts)
+
     def __repr__(self):
         disjuncts = ", ".join([str(disjunct) for disjunct in self.disjuncts])
         return f"Or({disjuncts})"
@@ -157,24 +386,36 @@ class Or(Sentence):
         return " ∨  ".join([Sentence.parenthesize(disjunct.formula())
                             for disjunct in self.disjuncts])
 
-    def symbols(self):
-        return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
+    def expression(self, operands, slots):
+        return " or ".join(operands) or "False"
 
 
 class Implication(Sentence):
-    def __init__(self, antecedent, consequent):
+    def __new__(cls, antecedent, consequent):
         Sentence.validate(antecedent)
         Sentence.validate(consequent)
-        self.antecedent = antecedent
-        self.consequent = consequent
+        sentence = super().__new__(cls)
+        sentence.antecedent = antecedent
+        sentence.consequent = consequent
+        return sentence.intern()
+
+    def __reduce__(self):
+        return (type(self), (self.antecedent, self.consequent))
 
     def __eq__(self, other):
-        return (isinstance(other, Implication)
-                and self.antecedent == other.antecedent
-                and self.consequent == other.consequent)
+        return self is other or (
+            not self.frozen and isinstance(other, Implication)
+            and self.antecedent == other.antecedent
+            and self.consequent == other.consequent
+        )
 
-    def __hash__(self):
-        return hash(("implies", hash(self.antecedent), hash(self.consequent)))
+    __hash__ = Sentence.__hash__
+
+    def key(self):
+        return ("implies", self.antecedent, self.consequent)
+
+    def parts(self):
+        return (self.antecedent, self.consequent)
 
     def __repr__(self):
         return f"Implication({self.antecedent}, {self.consequent})"
@@ -188,45 +429,375 @@ class Implication(Sentence):
         consequent = Sentence.parenthesize(self.consequent.formula())
         return f"{antecedent} => {consequent}"
 
-    def symbols(self):
-        return set.union(self.antecedent.symbols(), self.consequent.symbols())
+    def expression(self, operands, slots):
+        antecedent, consequent = operands
+        return f"not {antecedent} or {consequent}"
 
 
 class Biconditional(Sentence):
-    def __init__(self, left, right):
+    def __new__(cls, left, right):
         Sentence.validate(left)
         Sentence.validate(right)
-        self.left = left
-        self.right = right
+        sentence = super().__new__(cls)
+        sentence.left = left
+        sentence.right = right
+        return sentence.intern()
+
+    def __reduce__(self):
+        return (type(self), (self.left, self.right))
 
     def __eq__(self, other):
-        return (isinstance(other, Biconditional)
-                and self.left == other.left
-                and self.right == other.right)
+        return self is other or (
+            not self.frozen and isinstance(other, Biconditional)
+            and self.left == other.left
+            and self.right == other.right
+        )
 
-    def __hash__(self):
-        return hash(("biconditional", hash(self.left), hash(self.right)))
+    __hash__ = Sentence.__hash__
+
+    def key(self):
+        return ("biconditional", self.left, self.right)
+
+    def parts(self):
+        return (self.left, self.right)
 
     def __repr__(self):
         return f"Biconditional({self.left}, {self.right})"
 
     def evaluate(self, model):
-        return ((self.left.evaluate(model)
-                 and self.right.evaluate(model))
-                or (not self.left.evaluate(model)
-                    and not self.right.evaluate(model)))
+        return self.left.evaluate(model) == self.right.evaluate(model)
 
     def formula(self):
         left = Sentence.parenthesize(str(self.left))
         right = Sentence.parenthesize(str(self.right))
         return f"{left} <=> {right}"
 
-    def symbols(self):
-        return set.union(self.left.symbols(), self.right.symbols())
-
-
-def model_check(knowledge, query):
-    """Checks if knowledge base entails query."""
+    def expression(self, operands, slots):
+        # Symbols compile to 0 or 1 and connectives to booleans, which
+        # compare equal exactly when they have the same truth value
+        left, right = operands
+        return f"(not {left}) == (not {right})"
+
+
+def short_circuit(sentence, slots):
+    """
+    Returns Python statements computing a sentence in a model m, as a list
+    of lines and an expression for its value once they have run.
+
+    Each compound subsentence is assigned to a variable of its own, so
+    the code stays flat however deeply sentences nest. Later operands of
+    an And, Or or Implication are only computed under an if that finds
+    the value not yet decided, up to NESTING_LIMIT ifs deep, and past
+    that computed outright. The operands of an And or Or at the top
+    return as soon as they decide the sentence.
+    """
+    lines = []
+    # Variables of subsentences computed outside any if, which can be
+    # used by everything after them
+    names = {}
+    count = itertools.count()
+
+    def simple(part):
+        """
+        Returns source for the value of a symbol, constant or negated
+        one, or None for any other part.
+        """
+        if not part.parts():
+            return part.expression((), slots)
+        if isinstance(part, Not) and not part.operand.parts():
+            return part.expression([part.operand.expression((), slots)], slots)
+        return None
+
+    def operand(part, depth, tasks):
+        """
+        Returns a cell that will hold source for the value of a part,
+        adding a task to compute it at an if depth if it needs one.
+        """
+        source = simple(part)
+        if source is not None:
+            return [source]
+        # A sentence of simple parts is one expression, short-circuited
+        # by Python itself
+        sources = [simple(p) for p in part.parts()]
+        if None not in sources:
+            return [f"({part.expression(sources, slots)})"]
+        cell = [None]
+        tasks.append(("compute", part, depth, cell))
+        return cell
+
+    def line(depth, template, *cells):
+        return ("line", depth, template, cells)
+
+    tasks = []
+    if isinstance(sentence, (And, Or)) and sentence.parts():
+        # Only the value that decides the sentence is returned early
+        test, result = ("if not {}:", False) if isinstance(sentence, And) else ("if {}:", True)
+        for part in sentence.parts():
+            cell = operand(part, 0, tasks)
+            tasks.append(line(0, f"{test} return {result}", cell))
+        value = [str(not result)]
+    else:
+        value = operand(sentence, 0, tasks)
+
+    # Tasks are done in order off the end of the stack
+    stack = tasks[::-1]
+    while stack:
+        task = stack.pop()
+        if task[0] == "line":
+            _, depth, template, cells = task
+            lines.append("    " * depth + template.format(*[c[0] for c in cells]))
+            continue
+
+        _, node, depth, target = task
+        if depth == 0 and id(node) in names:
+            target[0] = names[id(node)]
+            continue
+        name = target[0] = f"t{next(count)}"
+        parts = node.parts()
+        tasks = []
+        if isinstance(node, (And, Or, Implication)) and len(parts) > 1 and depth < NESTING_LIMIT:
+            cell = operand(parts[0], depth, tasks)
+            if isinstance(node, Implication):
+                tasks.append(line(depth, f"{name} = not {{}}", cell))
+            else:
+                tasks.append(line(depth, f"{name} = {{}}", cell))
+            test = f"if {name}:" if isinstance(node, And) else f"if not {name}:"
+            for part in parts[1:]:
+                tasks.append(line(depth, test))
+                cell = operand(part, depth + 1, tasks)
+                tasks.append(line(depth + 1, f"{name} = {{}}", cell))
+        else:
+            cells = [operand(part, depth, tasks) for part in parts]
+            template = node.expression(["{}"] * len(parts), slots)
+            tasks.append(line(depth, f"{name} = {template}", *cells))
+        if depth == 0:
+            names[id(node)] = name
+        stack.extend(reversed(tasks))
+    return lines, value[0]
+
+
+def compile_function(argument, lines, result, namespace=None):
+    """
+    Returns a function of one argument that runs the lines and returns
+    the result expression, reusing the function already compiled from
+    the same source.
+    """
+    body = "".join(f"    {line}\n" for line in lines)
+    source = f"def function({argument}):\n{body}    return {result}\n"
+    function = compiled.get(source)
+    if function is None:
+        scope = dict(namespace or {})
+        exec(source, scope)
+        function = scope["function"]
+        if len(compiled) >= COMPILED_CAPACITY:
+            del compiled[next(iter(compiled))]
+        compiled[source] = function
+    return function
+
+
+def simplify(sentence):
+    """
+    Returns a sentence equivalent to the given one, with nested Ands and
+    Ors flattened into their parents, repeated operands removed, double
+    negations cancelled and constants folded away.
+    """
+    # Subsentences are simplified after their parts, with a stack rather
+    # than by recursion, so sentences nested past the recursion limit
+    # simplify too
+    simplified = {}
+    stack = [(sentence, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if id(node) in simplified:
+            continue
+        parts = node.parts()
+        if parts and not expanded:
+            stack.append((node, True))
+            stack.extend((part, False) for part in parts)
+            continue
+        simplified[id(node)] = simplify_node(node, [simplified[id(part)] for part in parts])
+    return simplified[id(sentence)]
+
+
+def negate(operand):
+    """Returns the simplified negation of a simplified sentence."""
+    if isinstance(operand, Constant):
+        return Constant(not operand.value)
+    if isinstance(operand, Not):
+        return operand.operand
+    return Not(operand)
+
+
+def simplify_node(sentence, operands):
+    """
+    Returns the simplified form of a sentence, given its parts already
+    simplified.
+    """
+    if isinstance(sentence, Not):
+        return negate(operands[0])
+
+    if isinstance(sentence, (And, Or)):
+        if isinstance(sentence, And):
+            kind, unit, zero = And, TRUE, FALSE
+        else:
+            kind, unit, zero = Or, FALSE, TRUE
+        flat = {}
+        pending = operands[::-1]
+        while pending:
+            operand = pending.pop()
+            if type(operand) is kind:
+                pending.extend(reversed(operand.parts()))
+            elif operand is zero:
+                return zero
+            elif operand is not unit:
+                flat[operand] = True
+        # An operand alongside its own negation decides the result
+        if any(isinstance(operand, Not) and operand.operand in flat for operand in flat):
+            return zero
+        if not flat:
+            return unit
+        if len(flat) == 1:
+            return next(iter(flat))
+        return kind(*flat)
+
+    if isinstance(sentence, Implication):
+        antecedent, consequent = operands
+        if antecedent is FALSE or consequent is TRUE or antecedent == consequent:
+            return TRUE
+        if antecedent is TRUE:
+            return consequent
+        if consequent is FALSE:
+            return negate(antecedent)
+        return Implication(antecedent, consequent)
+
+    if isinstance(sentence, Biconditional):
+        left, right = operands
+        if left == right:
+            return TRUE
+        for side, other in ((left, right), (right, left)):
+            if side is TRUE:
+                return other
+            if side is FALSE:
+                return negate(other)
+        return Biconditional(left, right)
+
+    return sentence
+
+
+class KnowledgeBase():
+    """
+    Sentences known to be true, answering whether they entail queries.
+
+    Up to ENUMERATION_LIMIT symbols, the models of the knowledge base are
+    kept as integers, with bit i standing for the ith symbol, and are
+    filtered by each sentence as it is added, so a query only has to be
+    checked in the models left. Beyond that, the sentences are compiled
+    to clauses once, and each query is decided by the SAT solver.
+    """
+    def __init__(self, *sentences):
+        self.sentences = []
+        self.symbols = []
+        self.models = [0]
+        self.cnf = None
+        for sentence in sentences:
+            self.add(sentence)
+
+    def add(self, sentence):
+        """Adds a sentence to the knowledge base."""
+        Sentence.validate(sentence)
+        self.sentences.append(sentence)
+        new = sorted(sentence.symbols() - set(self.symbols))
+        if self.models is not None:
+            if len(self.symbols) + len(new) > ENUMERATION_LIMIT:
+                self.models = None
+            else:
+                # Each model so far splits into one per assignment of
+                # the new symbols, in the bits above the old ones
+                shift = len(self.symbols)
+                self.models = [model | extra << shift for model in self.models
+                               for extra in range(2 ** len(new))]
+        self.symbols.extend(new)
+        if self.models is not None:
+            check = sentence.compile(self.symbols)
+            self.models = [model for model in self.models if check(model)]
+        if self.cnf is not None:
+            self.cnf.add(sentence)
+
+    def ask(self, query):
+        """Checks if the knowledge base entails query."""
+        return self.ask_all([query])[0]
+
+    def ask_all(self, queries):
+        """
+        Returns whether the knowledge base entails each of the queries,
+        checking them all in one pass over its models, or with the SAT
+        solver if they bring the symbols past ENUMERATION_LIMIT.
+        """
+        # Symbols only in queries are unconstrained, so every assignment
+        # of them is tried with every model, unless that makes for more
+        # symbols than are enumerated anywhere else
+        extra = sorted(set().union(*[query.symbols() for query in queries])
+                       - set(self.symbols))
+        symbols = self.symbols + extra
+        if self.models is None or len(symbols) > ENUMERATION_LIMIT:
+            return [self.ask_solver(query) for query in queries]
+
+        checks = [query.compile(symbols) for query in queries]
+        entailed = [True] * len(queries)
+        shift = len(self.symbols)
+        for model in self.models:
+            for assignment in range(2 ** len(extra)):
+                full = model | assignment << shift
+                for i, check in enumerate(checks):
+                    if entailed[i] and not check(full):
+                        entailed[i] = False
+                if not any(entailed):
+                    return entailed
+        return entailed
+
+    def ask_solver(self, query):
+        """Checks if the knowledge base entails query, with the SAT solver."""
+        from sat import CNF, Solver
+        if self.cnf is None:
+            self.cnf = CNF()
+            for sentence in self.sentences:
+                self.cnf.add(sentence)
+        negation = [-self.cnf.literal(query)]
+        return Solver(self.cnf.clauses + [negation], self.cnf.count).solve() is None
+
+
+def model_check(knowledge, query, method=None, workers=1):
+    """
+    Checks if knowledge base entails query.
+
+    With method="compiled" every model is enumerated with compiled
+    sentences, and with method="sat" this is decided by a SAT solver.
+    By default the first is used for up to ENUMERATION_LIMIT symbols
+    and the second beyond. With method="enumerate" every model is
+    enumerated by evaluating the sentences, which is kept as a reference,
+    and with method="truthtable" all models are evaluated as NumPy arrays,
+    in chunks spread over `workers` threads.
+    """
+    if method is None:
+        symbols = set.union(knowledge.symbols(), query.symbols())
+        method = "compiled" if len(symbols) <= ENUMERATION_LIMIT else "sat"
+    if method == "sat":
+        # sat builds on this module, so it can only be imported once
+        # the sentence classes exist
+        from sat import entails
+        return entails(knowledge, query)
+    if method == "enumerate":
+        return model_check_enumerate(knowledge, query)
+    if method == "compiled":
+        return model_check_compiled(knowledge, query)
+    if method == "truthtable":
+        from truthtable import entails
+        return entails(knowledge, query, workers)
+    raise ValueError(f"unknown model checking method {method!r}")
+
+
+def model_check_enumerate(knowledge, query):
+    """Checks if knowledge base entails query, by enumerating all models."""
 
     def check_all(knowledge, query, symbols, model):
         """Checks if knowledge base entails query, given a particular model."""
@@ -261,3 +832,15 @@ def model_check(knowledge, query):
 
     # Check that knowledge entails query
     return check_all(knowledge, query, symbols, dict())
+
+
+def model_check_compiled(knowledge, query):
+    """
+    Checks if knowledge base entails query, by evaluating the compiled
+    sentences in every model, numbered as integers.
+    """
+    symbols = sorted(set.union(knowledge.symbols(), query.symbols()))
+    knowledge = knowledge.compile(symbols)
+    query = query.compile(symbols)
+    return all(query(model) for model in range(2 ** len(symbols))
+               if knowledge(model))
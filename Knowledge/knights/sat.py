@@ -0,0 +1,270 @@
+"""
+Entailment by satisfiability
+
+A knowledge base entails a query exactly when the knowledge base and
+the negation of the query can't both be true. Sentences are compiled to
+conjunctive normal form by the Tseitin encoding, which gives every
+compound subsentence a variable of its own instead of distributing Or
+over And, so clauses grow linearly with the sentence. The clauses are
+then handed to a DPLL solver.
+
+Variables are positive integers and literals are variables or their
+negations, as in the DIMACS format.
+"""
+
+from logic import And, Biconditional, Constant, Implication, Not, Or, Symbol
+
+
+class CNF():
+    """
+    Clauses over numbered variables, built up from sentences.
+
+    Symbols keep the same variable, and repeated subsentences the same
+    Tseitin variable, across every sentence added.
+    """
+    def __init__(self):
+        self.variables = {}
+        self.literals = {}
+        self.clauses = []
+        self.count = 0
+        self.true = None
+
+    def variable(self):
+        self.count += 1
+        return self.count
+
+    def add(self, sentence):
+        """
+        Adds clauses that are satisfiable exactly when the sentence is.
+        """
+        self.clauses.append([self.literal(sentence)])
+
+    def literal(self, sentence):
+        """
+        Returns a literal that the clauses make equivalent to a sentence.
+
+        Subsentences are visited with a stack rather than by recursion,
+        so sentences nested past the recursion limit compile too.
+        """
+        found = {}
+        stack = [(sentence, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if id(node) in found:
+                continue
+            if isinstance(node, Symbol):
+                if node.name not in self.variables:
+                    self.variables[node.name] = self.variable()
+                found[id(node)] = self.variables[node.name]
+            elif isinstance(node, Constant):
+                # One variable, held true by a unit clause, stands for both
+                if self.true is None:
+                    self.true = self.variable()
+                    self.clauses.append([self.true])
+                found[id(node)] = self.true if node.value else -self.true
+            elif not isinstance(node, Not) and node in self.literals:
+                found[id(node)] = self.literals[node]
+            elif not expanded:
+                stack.append((node, True))
+                stack.extend((part, False) for part in reversed(node.parts()))
+            elif isinstance(node, Not):
+                found[id(node)] = -found[id(node.operand)]
+            else:
+                operands = [found[id(part)] for part in node.parts()]
+                found[id(node)] = self.literals[node] = self.gate(node, operands)
+        return found[id(sentence)]
+
+    def gate(self, sentence, operands):
+        """
+        Returns a new variable that added clauses make equivalent to a
+        connective of the literals of its parts.
+        """
+        if not isinstance(sentence, (And, Or, Implication, Biconditional)):
+            raise TypeError(f"cannot compile {type(sentence).__name__} to CNF")
+        gate = self.variable()
+        if isinstance(sentence, And):
+            # gate => every conjunct, and all the conjuncts => gate
+            self.clauses.extend([-gate, operand] for operand in operands)
+            self.clauses.append([gate] + [-operand for operand in operands])
+        elif isinstance(sentence, (Or, Implication)):
+            if isinstance(sentence, Implication):
+                operands = [-operands[0], operands[1]]
+            # gate => some disjunct, and each disjunct => gate
+            self.clauses.append([-gate] + operands)
+            self.clauses.extend([gate, -operand] for operand in operands)
+        else:
+            left, right = operands
+            self.clauses.extend([
+                [-gate, -left, right], [-gate, left, -right],
+                [gate, left, right], [gate, -left, -right],
+            ])
+        return gate
+
+
+class Solver():
+    """
+    DPLL satisfiability solver.
+
+    Each clause watches two of its literals and is only looked at when
+    one of them becomes false, to find another literal to watch or, if
+    there is none, to set the other watched literal true by unit
+    propagation. Pure literals are set before the first decision.
+    """
+    def __init__(self, clauses, count):
+        self.count = count
+        self.values = [None] * (count + 1)
+        self.trail = []
+        self.watches = {}
+        self.units = []
+        self.clauses = []
+        self.conflicting = False
+        for clause in clauses:
+            clause = list(dict.fromkeys(clause))
+            if any(-literal in clause for literal in clause):
+                continue
+            if not clause:
+                self.conflicting = True
+            elif len(clause) == 1:
+                self.units.append(clause[0])
+            else:
+                self.clauses.append(clause)
+                self.watches.setdefault(clause[0], []).append(clause)
+                self.watches.setdefault(clause[1], []).append(clause)
+
+        # Decide on the most frequent variables first
+        occurrences = [0] * (count + 1)
+        for clause in self.clauses:
+            for literal in clause:
+                occurrences[abs(literal)] += 1
+        self.order = sorted(range(1, count + 1), key=lambda v: -occurrences[v])
+
+    def value(self, literal):
+        value = self.values[abs(literal)]
+        if value is None:
+            return None
+        return value == (literal > 0)
+
+    def assign(self, literal):
+        """
+        Makes a literal true, returning False if it is already false.
+        """
+        value = self.value(literal)
+        if value is not None:
+            return value
+        self.values[abs(literal)] = literal > 0
+        self.trail.append(literal)
+        return True
+
+    def propagate(self, start):
+        """
+        Sets every literal implied by unit clauses, starting from the
+        assignments on the trail at index `start`. Returns False if a
+        clause becomes false.
+        """
+        index = start
+        while index < len(self.trail):
+            false = -self.trail[index]
+            index += 1
+            watching = self.watches.get(false, [])
+            kept = []
+            for position, clause in enumerate(watching):
+                if clause[0] == false:
+                    clause[0], clause[1] = clause[1], clause[0]
+                other = clause[0]
+                if self.value(other) is True:
+                    kept.append(clause)
+                    continue
+                for i in range(2, len(clause)):
+                    if self.value(clause[i]) is not False:
+                        clause[1], clause[i] = clause[i], clause[1]
+                        self.watches.setdefault(clause[1], []).append(clause)
+                        break
+                else:
+                    kept.append(clause)
+                    if not self.assign(other):
+                        kept.extend(watching[position + 1:])
+                        self.watches[false] = kept
+                        return False
+            self.watches[false] = kept
+        return True
+
+    def pure_literals(self):
+        """
+        Returns the literals whose negation appears in no clause not yet
+        satisfied.
+        """
+        seen = set()
+        for clause in self.clauses:
+            if any(self.value(literal) for literal in clause):
+                continue
+            seen.update(literal for literal in clause if self.value(literal) is None)
+        return [literal for literal in seen if -literal not in seen]
+
+    def solve(self):
+        """
+        Returns a satisfying assignment as a list of booleans indexed by
+        variable, or None if the clauses are unsatisfiable.
+        """
+        if self.conflicting:
+            return None
+        if not all(self.assign(literal) for literal in self.units):
+            return None
+        if not self.propagate(0):
+            return None
+        while True:
+            pure = self.pure_literals()
+            if not pure:
+                break
+            start = len(self.trail)
+            for literal in pure:
+                self.assign(literal)
+            self.propagate(start)
+
+        # Decisions as (trail length before, literal, whether flipped)
+        decisions = []
+        while True:
+            for variable in self.order:
+                if self.values[variable] is None:
+                    break
+            else:
+                return [bool(value) for value in self.values]
+
+            start = len(self.trail)
+            decisions.append((start, variable, False))
+            self.assign(variable)
+            while not self.propagate(start):
+                # Undo decisions back to the latest not yet tried both
+                # ways, and try its other value
+                while decisions:
+                    start, literal, flipped = decisions.pop()
+                    for assigned in self.trail[start:]:
+                        self.values[abs(assigned)] = None
+                    del self.trail[start:]
+                    if not flipped:
+                        decisions.append((start, -literal, True))
+                        self.assign(-literal)
+                        break
+                else:
+                    return None
+
+
+def satisfiable(*sentences):
+    """
+    Returns a model in which all the sentences are true, as a dict from
+    symbol names to booleans, or None if there is none.
+    """
+    cnf = CNF()
+    for sentence in sentences:
+        cnf.add(sentence)
+    values = Solver(cnf.clauses, cnf.count).solve()
+    if values is None:
+        return None
+    return {name: values[variable] for name, variable in cnf.variables.items()}
+
+
+def entails(knowledge, query):
+    """
+    Returns True if the knowledge base entails the query, that is, if
+    the knowledge base is unsatisfiable together with not query.
+    """
+    return satisfiable(knowledge, Not(query)) is None
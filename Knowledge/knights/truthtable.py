@@ -0,0 +1,159 @@
+"""
+Entailment by truth table
+
+Evaluates sentences in every model at once: the models are numbered,
+and symbol i is a boolean NumPy column holding bit i of each model's
+number. Sentences compile to expressions over these columns, and the
+knowledge base entails the query if no model makes the knowledge base
+true and the query false.
+
+The 2 ** n models are split into chunks of 2 ** CHUNK_BITS, so memory
+stays bounded, and chunks can be evaluated on several threads since
+NumPy releases the GIL for whole-array operations. In a chunk the low
+bits of the model numbers vary and become shared columns, while the
+high bits are constant and become scalars.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from logic import (And, Biconditional, Constant, Implication, Not, Or, Symbol,
+                   compile_function)
+
+# Models per chunk, as a power of two
+CHUNK_BITS = 20
+
+
+def expression(sentence, operands):
+    """
+    Returns Python source for a sentence's value over the columns, given
+    the sources of its parts' values.
+    """
+    if isinstance(sentence, Constant):
+        return "TRUE" if sentence.value else "FALSE"
+    if isinstance(sentence, Not):
+        return f"~{operands[0]}"
+    if isinstance(sentence, And):
+        return " & ".join(operands) or "TRUE"
+    if isinstance(sentence, Or):
+        return " | ".join(operands) or "FALSE"
+    if isinstance(sentence, Implication):
+        antecedent, consequent = operands
+        return f"~{antecedent} | {consequent}"
+    if isinstance(sentence, Biconditional):
+        left, right = operands
+        return f"{left} == {right}"
+    raise TypeError(f"cannot compile {type(sentence).__name__} to a truth table")
+
+
+def compile_columns(sentence, symbols):
+    """
+    Returns a function evaluating a sentence over a list of columns, one
+    per symbol in `symbols`.
+
+    Each compound subsentence gets a variable of its own, deleted after
+    its last use, and the operands of an And or Or are folded into its
+    variable in place one at a time. So only about one column per level
+    of nesting is alive at once, however many sentences there are.
+    """
+    slots = {name: i for i, name in enumerate(symbols)}
+
+    # How many parents use each compound subsentence
+    uses = {}
+    seen = {id(sentence)}
+    stack = [sentence]
+    while stack:
+        for part in stack.pop().parts():
+            uses[id(part)] = uses.get(id(part), 0) + 1
+            if id(part) not in seen:
+                seen.add(id(part))
+                stack.append(part)
+
+    lines = []
+    names = {}
+
+    def operand(part):
+        """Returns source for the value of a part, computed beforehand."""
+        if isinstance(part, Symbol):
+            return f"c[{slots[part.name]}]"
+        if not part.parts():
+            return expression(part, [])
+        return names[id(part)]
+
+    def release(part):
+        """Deletes the variable of a part once nothing else needs it."""
+        if id(part) in names:
+            uses[id(part)] -= 1
+            if uses[id(part)] == 0:
+                lines.append(f"del {names[id(part)]}")
+
+    # Tasks are ("visit", sentence), ("combine", sentence, parts) or
+    # ("fold", sentence, part), done in order off the end of the stack
+    stack = [("visit", sentence)]
+    while stack:
+        task = stack.pop()
+        node = task[1]
+        if task[0] == "visit":
+            parts = node.parts()
+            if not parts or id(node) in names:
+                continue
+            names[id(node)] = f"t{len(names)}"
+            if isinstance(node, (And, Or)) and len(parts) > 2:
+                tasks = [("visit", parts[0]), ("visit", parts[1]),
+                         ("combine", node, parts[:2])]
+                for part in parts[2:]:
+                    tasks.extend([("visit", part), ("fold", node, part)])
+            else:
+                tasks = [("visit", part) for part in parts]
+                tasks.append(("combine", node, parts))
+            stack.extend(reversed(tasks))
+        elif task[0] == "combine":
+            parts = task[2]
+            source = expression(node, [operand(part) for part in parts])
+            lines.append(f"{names[id(node)]} = {source}")
+            for part in parts:
+                release(part)
+        else:
+            part = task[2]
+            # The variable was made by combining the first two operands,
+            # so it is a new array that nothing else refers to
+            update = "&=" if isinstance(node, And) else "|="
+            lines.append(f"{names[id(node)]} {update} {operand(part)}")
+            release(part)
+
+    return compile_function("c", lines, operand(sentence),
+                            {"TRUE": np.True_, "FALSE": np.False_})
+
+
+def columns(bits):
+    """
+    Returns boolean columns with bit i of each number below 2 ** bits.
+    """
+    numbers = np.arange(2 ** bits, dtype=np.int64)
+    return [(numbers >> i & 1).astype(bool) for i in range(bits)]
+
+
+def entails(knowledge, query, workers=1):
+    """
+    Returns True if the query is true in every model of the knowledge
+    base, evaluating chunks of models on `workers` threads.
+    """
+    symbols = sorted(set.union(knowledge.symbols(), query.symbols()))
+    counterexample = compile_columns(And(knowledge, Not(query)), symbols)
+    low = min(len(symbols), CHUNK_BITS)
+    shared = columns(low)
+
+    def refuted(chunk):
+        """Returns True if a model in the chunk is a counterexample."""
+        high = [np.bool_(chunk >> i & 1) for i in range(len(symbols) - low)]
+        return bool(np.any(counterexample(shared + high)))
+
+    chunks = range(2 ** (len(symbols) - low))
+    if workers > 1 and len(chunks) > 1:
+        with ThreadPoolExecutor(workers) as executor:
+            found = any(executor.map(refuted, chunks))
+            # Chunks not yet started can't change the answer
+            executor.shutdown(cancel_futures=True)
+        return not found
+    return not any(map(refuted, chunks))
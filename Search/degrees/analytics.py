@@ -0,0 +1,226 @@
+import argparse
+import csv
+import multiprocessing
+import sys
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from graph import BlankStrings, CompactGraph, load_graph
+
+# Sources searched at once by the bitset search, one per bit of a word
+WORD_BITS = 64
+
+ARRAYS = ("person_indptr", "person_movies", "movie_indptr", "movie_stars")
+
+# Graph used by pool workers, attached to the parent's shared memory
+worker_graph = None
+worker_blocks = []
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Closeness and eccentricity of the most prolific actors."
+    )
+    parser.add_argument("directory", help="dataset directory")
+    parser.add_argument("--top", type=int, default=100,
+                        help="number of actors with the most movies to rank")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of processes to search with")
+    parser.add_argument("--bitset", action="store_true",
+                        help=f"search from {WORD_BITS} actors at once")
+    parser.add_argument("--output", help="output CSV file (default: stdout)")
+    args = parser.parse_args()
+
+    print("Loading data...", file=sys.stderr)
+    graph = load_graph(args.directory)
+    print("Data loaded.", file=sys.stderr)
+
+    sources = top_people(graph, args.top)
+    start = time.perf_counter()
+    counts = sweep(graph, sources, args.workers, args.bitset)
+    elapsed = time.perf_counter() - start
+    print(f"{len(sources)} searches in {elapsed:.2f}s", file=sys.stderr)
+
+    if args.output is None:
+        write_results(graph, sources, counts, sys.stdout)
+    else:
+        with open(args.output, "w", encoding="utf-8", newline="") as f:
+            write_results(graph, sources, counts, f)
+
+
+def top_people(graph, n):
+    """
+    Returns the indices of the n people who starred in the most movies.
+    """
+    counts = np.diff(graph.person_indptr)
+    return np.argsort(-counts, kind="stable")[:n].tolist()
+
+
+def sweep(graph, sources, workers=1, bitset=False):
+    """
+    Returns, for each source person index, the list of how many people
+    are at each distance from them.
+
+    With `workers` > 1 the searches run in a process pool that reads the
+    graph arrays from shared memory instead of loading its own copy.
+    """
+    if bitset:
+        tasks = [sources[i:i + WORD_BITS]
+                 for i in range(0, len(sources), WORD_BITS)]
+        search = bitset_layer_counts
+    else:
+        tasks = [[source] for source in sources]
+        search = layer_counts
+
+    if workers <= 1:
+        results = [search(graph, task) for task in tasks]
+    else:
+        blocks, descriptors = share_arrays(graph)
+        try:
+            with multiprocessing.Pool(
+                workers, initializer=attach_arrays,
+                initargs=(descriptors, graph.num_people, graph.num_movies)
+            ) as pool:
+                results = pool.map(run_task, [(search, task)
+                                              for task in tasks])
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+    return [counts for result in results for counts in result]
+
+
+def layer_counts(graph, sources):
+    """
+    Runs one breadth-first search per source and returns its layer sizes.
+    """
+    return [[1] + [len(layer) for layer in graph.bfs_layers(source)]
+            for source in sources]
+
+
+def bitset_layer_counts(graph, sources):
+    """
+    Runs breadth-first searches from up to WORD_BITS sources at once.
+
+    Every person holds a 64-bit word whose bit i is set once source i has
+    reached them, so one pass of OR operations over the CSR arrays
+    advances all searches by a layer.
+    """
+    bits = np.left_shift(np.uint64(1),
+                         np.arange(len(sources), dtype=np.uint64))
+    frontier = np.zeros(graph.num_people, dtype=np.uint64)
+    np.bitwise_or.at(frontier, np.array(sources, dtype=np.int64), bits)
+    visited = frontier.copy()
+    counts = [[1] for _ in sources]
+
+    while True:
+        movie_bits = or_rows(frontier[graph.movie_stars], graph.movie_indptr)
+        reached = or_rows(movie_bits[graph.person_movies],
+                          graph.person_indptr)
+        frontier = reached & ~visited
+        new = frontier[frontier != 0]
+        if not len(new):
+            return counts
+        visited |= frontier
+
+        # Count the people each source reached at this depth, bit by bit
+        per_bit = np.unpackbits(
+            new.astype("<u8").view(np.uint8), bitorder="little"
+        ).reshape(-1, WORD_BITS).sum(axis=0)
+        for i, count in enumerate(per_bit[:len(sources)].tolist()):
+            if count:
+                counts[i].append(count)
+
+
+def or_rows(values, indptr):
+    """
+    Returns the bitwise OR of `values` over each CSR row of `indptr`,
+    with 0 for empty rows.
+    """
+    result = np.zeros(len(indptr) - 1, dtype=np.uint64)
+    starts = indptr[:-1]
+    nonempty = np.flatnonzero(indptr[1:] > starts)
+    if len(nonempty):
+        # Empty rows in between have no values, so each segment between
+        # consecutive non-empty starts is exactly one row
+        result[nonempty] = np.bitwise_or.reduceat(values, starts[nonempty])
+    return result
+
+
+def share_arrays(graph):
+    """
+    Copies the graph's CSR arrays into shared memory blocks.
+
+    Returns the blocks and (name, shape, dtype) descriptors to attach them.
+    """
+    blocks, descriptors = [], {}
+    for name in ARRAYS:
+        array = np.asarray(getattr(graph, name))
+        block = shared_memory.SharedMemory(create=True,
+                                           size=max(array.nbytes, 1))
+        np.ndarray(array.shape, array.dtype, buffer=block.buf)[:] = array
+        blocks.append(block)
+        descriptors[name] = (block.name, array.shape, array.dtype.str)
+    return blocks, descriptors
+
+
+def attach_arrays(descriptors, num_people, num_movies):
+    """
+    Pool initializer: builds worker_graph over the shared CSR arrays.
+    """
+    global worker_graph
+    arrays = {}
+    for name, (block_name, shape, dtype) in descriptors.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        worker_blocks.append(block)
+        arrays[name] = np.ndarray(shape, dtype, buffer=block.buf)
+    people, movies = BlankStrings(num_people), BlankStrings(num_movies)
+    worker_graph = CompactGraph(people, people, people,
+                                movies, movies, movies, **arrays)
+
+
+def run_task(task):
+    search, sources = task
+    return search(worker_graph, sources)
+
+
+def summarize(counts, num_people):
+    """
+    Returns closeness statistics from the layer sizes of one search.
+    """
+    reached = sum(counts)
+    total = sum(depth * count for depth, count in enumerate(counts))
+    harmonic = sum(count / depth for depth, count in enumerate(counts)
+                   if depth)
+    return {
+        "reached": reached,
+        "eccentricity": len(counts) - 1,
+        "mean_distance": total / (reached - 1) if reached > 1 else 0.0,
+        "closeness": (reached - 1) / total if total else 0.0,
+        "harmonic_closeness": (harmonic / (num_people - 1)
+                               if num_people > 1 else 0.0),
+    }
+
+
+def write_results(graph, sources, counts, f):
+    """
+    Writes one CSV row of statistics per source person.
+    """
+    fields = ["person_id", "name", "movies", "reached", "eccentricity",
+              "mean_distance", "closeness", "harmonic_closeness"]
+    writer = csv.DictWriter(f, fieldnames=fields)
+    writer.writeheader()
+    for source, layers in zip(sources, counts):
+        row = {
+            "person_id": graph.person_ids[source],
+            "name": graph.names[source],
+            "movies": graph.film_count(source),
+        }
+        row.update(summarize(layers, graph.num_people))
+        writer.writerow(row)
+
+
+if __name__ == "__main__":
+    main()
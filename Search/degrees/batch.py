@@ -0,0 +1,136 @@
+import argparse
+import csv
+import json
+import multiprocessing
+import sys
+
+import degrees
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Answer many degrees-of-separation queries at once."
+    )
+    parser.add_argument("directory", help="dataset directory")
+    parser.add_argument("pairs", help="CSV file of source,target rows")
+    parser.add_argument("--output", help="output file (default: stdout)")
+    parser.add_argument("--format", choices=["csv", "jsonl"], default="csv")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of processes to search with")
+    args = parser.parse_args()
+
+    print("Loading data...", file=sys.stderr)
+    degrees.load_data(args.directory, compact=True)
+    print("Data loaded.", file=sys.stderr)
+
+    results = batch_shortest_paths(read_pairs(args.pairs), args.workers)
+    if args.output is None:
+        write_results(results, sys.stdout, args.format)
+    else:
+        with open(args.output, "w", encoding="utf-8", newline="") as f:
+            write_results(results, f, args.format)
+
+
+def read_pairs(filename):
+    """
+    Yields (source, target) pairs from a CSV file, skipping a header row.
+    Sources and targets may be person_ids or names.
+    """
+    with open(filename, encoding="utf-8", newline="") as f:
+        for row in csv.reader(f):
+            if len(row) < 2 or row[:2] == ["source", "target"]:
+                continue
+            yield row[0].strip(), row[1].strip()
+
+
+def batch_shortest_paths(pairs, workers=1):
+    """
+    Yields a result dictionary for every (source, target) pair.
+
+    Pairs are grouped by source so that a single search answers every
+    target of a source. With `workers` > 1 the groups are spread over a
+    process pool that inherits the loaded graph through fork.
+    Results are yielded in group order, not input order.
+    """
+    groups = {}
+    for source, target in pairs:
+        groups.setdefault(source, []).append(target)
+
+    if workers > 1:
+        try:
+            context = multiprocessing.get_context("fork")
+        except ValueError:
+            # Without fork, workers would have to reload the dataset
+            context = None
+        if context is not None:
+            with context.Pool(workers) as pool:
+                for results in pool.imap_unordered(answer_group,
+                                                   groups.items()):
+                    yield from results
+            return
+
+    for group in groups.items():
+        yield from answer_group(group)
+
+
+def answer_group(group):
+    """
+    Returns the result dictionaries for one source and its targets.
+    """
+    source, targets = group
+    source_id = resolve(source)
+    target_ids = {target: resolve(target) for target in targets}
+    known = [i for i in target_ids.values() if i is not None]
+    if source_id is not None and known:
+        paths = degrees.shortest_paths_from(source_id, known)
+
+    results = []
+    for target in targets:
+        result = {"source": source, "target": target,
+                  "degrees": None, "path": None, "error": None}
+        if source_id is None:
+            result["error"] = "source not found"
+        elif target_ids[target] is None:
+            result["error"] = "target not found"
+        else:
+            path = paths[target_ids[target]]
+            if path is None:
+                result["error"] = "not connected"
+            else:
+                result["degrees"] = len(path)
+                result["path"] = path
+        results.append(result)
+    return results
+
+
+def resolve(person):
+    """
+    Returns the person_id for a person_id or a name, or None if there is
+    no such person. Ambiguous names resolve to the person in most movies.
+    """
+    if degrees.is_person(person):
+        return person
+    return degrees.person_id_for_name(person, policy="most_films")
+
+
+def write_results(results, f, format):
+    """
+    Streams result dictionaries to `f` as CSV or JSON lines.
+    """
+    if format == "jsonl":
+        for result in results:
+            f.write(json.dumps(result) + "\n")
+        return
+
+    writer = csv.writer(f)
+    writer.writerow(["source", "target", "degrees", "path", "error"])
+    for result in results:
+        path = result["path"]
+        if path is not None:
+            path = " ".join(f"{movie}:{person}" for movie, person in path)
+        writer.writerow([result["source"], result["target"],
+                         result["degrees"], path, result["error"]])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+import degrees
+
+# Search modes benchmarked on each loader, as (name, compact, mode)
+CASES = [
+    ("dict/bfs", False, "bfs"),
+    ("dict/bidirectional", False, "bidirectional"),
+    ("compact/bfs", True, "bfs"),
+    ("compact/bidirectional", True, "bidirectional"),
+    ("compact/alt", True, "alt"),
+    ("compact/tree", True, "tree"),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark degrees searches on a synthetic graph."
+    )
+    parser.add_argument("--people", type=int, default=20000)
+    parser.add_argument("--movies", type=int, default=10000)
+    parser.add_argument("--cast", type=float, default=6,
+                        help="mean number of stars per movie")
+    parser.add_argument("--exponent", type=float, default=0.8,
+                        help="power-law exponent of actor popularity")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--landmarks", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cases", nargs="+", choices=[c[0] for c in CASES],
+                        default=[c[0] for c in CASES])
+    parser.add_argument("--directory",
+                        help="keep the generated dataset in this directory")
+    parser.add_argument("--output", help="output JSON file (default: stdout)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        directory = args.directory or scratch
+        generate(directory, args.people, args.movies, args.cast,
+                 args.exponent, args.seed)
+        report = {
+            "commit": git_commit(),
+            "config": {key: value for key, value in vars(args).items()
+                       if key not in ("directory", "output")},
+            "cases": run_cases(directory, args),
+        }
+
+    text = json.dumps(report, indent=2)
+    if args.output is None:
+        print(text)
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+
+def generate(directory, people, movies, cast, exponent, seed):
+    """
+    Writes a synthetic people/movies/stars dataset to `directory`.
+
+    Movie cast sizes are 1 plus a Poisson draw, and stars are drawn with
+    probability proportional to rank ** -exponent, giving the power-law
+    degree distribution of real co-star graphs.
+    """
+    rng = np.random.default_rng(seed)
+    os.makedirs(directory, exist_ok=True)
+
+    weights = np.arange(1, people + 1, dtype=float) ** -exponent
+    popularity = rng.permutation(people)
+    sizes = 1 + rng.poisson(max(cast - 1, 0), movies)
+    stars = popularity[rng.choice(people, sizes.sum(),
+                                  p=weights / weights.sum())]
+    roles = np.repeat(np.arange(movies), sizes)
+
+    with open(os.path.join(directory, "people.csv"), "w",
+              encoding="utf-8") as f:
+        f.write("id,name,birth\n")
+        births = rng.integers(1900, 2010, people)
+        for i in range(people):
+            f.write(f'{i + 1},"Person {i + 1}",{births[i]}\n')
+    with open(os.path.join(directory, "movies.csv"), "w",
+              encoding="utf-8") as f:
+        f.write("id,title,year\n")
+        years = rng.integers(1920, 2024, movies)
+        for i in range(movies):
+            f.write(f'{i + 1},"Movie {i + 1}",{years[i]}\n')
+    with open(os.path.join(directory, "stars.csv"), "w",
+              encoding="utf-8") as f:
+        f.write("person_id,movie_id\n")
+        for person, movie in zip(stars.tolist(), roles.tolist()):
+            f.write(f"{person + 1},{movie + 1}\n")
+
+
+def run_cases(directory, args):
+    """
+    Replays the same random queries against every selected case and
+    returns a dictionary of results per case.
+    """
+    rng = random.Random(args.seed)
+    people = [str(i + 1) for i in range(args.people)]
+    queries = [(rng.choice(people), rng.choice(people))
+               for _ in range(args.queries)]
+
+    results = {}
+    loaded = None
+    for name, compact, mode in CASES:
+        if name not in args.cases:
+            continue
+        if loaded != compact:
+            load = measure_load(directory, compact, args.landmarks)
+            loaded = compact
+        result = replay(queries, mode)
+        result["load"] = load
+        results[name] = result
+        print(f"{name}: p50 {result['p50_ms']:.3f}ms, "
+              f"p99 {result['p99_ms']:.3f}ms", file=sys.stderr)
+    return results
+
+
+def measure_load(directory, compact, landmarks):
+    """
+    Loads the dataset, returning the seconds and peak traced memory taken.
+    """
+    degrees.people.clear()
+    degrees.movies.clear()
+    degrees.graph = degrees.landmark_index = None
+    tracemalloc.start()
+    start = time.perf_counter()
+    degrees.load_data(directory, compact=compact, snapshot=False,
+                      landmarks=landmarks if compact else 0)
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": seconds, "peak_memory_bytes": peak}
+
+
+def replay(queries, mode):
+    """
+    Runs every query once for latency, then once more counting the people
+    expanded and the peak memory traced.
+    """
+    latencies = []
+    found = 0
+    for source, target in queries:
+        start = time.perf_counter()
+        path = search(source, target, mode)
+        latencies.append(time.perf_counter() - start)
+        found += path is not None
+
+    expanded = []
+    tracemalloc.start()
+    for source, target in queries:
+        expanded.append(count_expanded(source, target, mode))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies = np.array(latencies) * 1000
+    return {
+        "queries": len(queries),
+        "found": found,
+        "mean_ms": float(latencies.mean()),
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+        "expanded_mean": float(np.mean(expanded)),
+        "expanded_max": int(np.max(expanded)),
+        "peak_memory_bytes": peak,
+    }
+
+
+def search(source, target, mode):
+    if mode == "tree":
+        return degrees.shortest_paths_from(source, [target])[target]
+    return degrees.shortest_path(source, target, mode=mode)
+
+
+def count_expanded(source, target, mode):
+    """
+    Returns how many people had their neighbors generated by a search.
+    """
+    if mode == "tree":
+        graph = degrees.graph
+        tree = graph.bfs_tree(graph.person_index[source],
+                              [graph.person_index[target]])
+        reached = tree.distance[tree.distance >= 0]
+        return int((reached < reached.max()).sum()) if reached.max() else 0
+
+    expanded = set()
+    if degrees.graph is not None:
+        owner, name = degrees.graph, "neighbors"
+    else:
+        owner, name = degrees, "neighbors_for_person"
+    neighbors = getattr(owner, name)
+
+    def counting(person):
+        expanded.add(person)
+        return neighbors(person)
+
+    setattr(owner, name, counting)
+    try:
+        search(source, target, mode)
+    finally:
+        if owner is degrees:
+            setattr(owner, name, neighbors)
+        else:
+            delattr(owner, name)
+    return len(expanded)
+
+
+def git_commit():
+    """
+    Returns the current git commit, or None outside a git checkout.
+    """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+            check=True, cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+if __name__ == "__main__":
+    main()
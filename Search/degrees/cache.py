@@ -0,0 +1,162 @@
+from collections import Counter, OrderedDict
+
+import degrees
+
+# Marks a cache miss, since None is a valid cached result (not connected)
+MISSING = object()
+
+
+class LRUCache():
+    """
+    Dictionary bounded to `capacity` entries, evicting the least recently
+    used entry first.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        try:
+            self.entries.move_to_end(key)
+        except KeyError:
+            return default
+        return self.entries[key]
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self.entries.clear()
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class PathCache():
+    """
+    Answers degrees.shortest_path queries from cached results.
+
+    Paths are cached per unordered pair of people and reversed when asked
+    for the other way round. Once a person has been an endpoint of
+    `hot_threshold` queries, the full breadth-first search tree from them
+    is cached too (compact graph only), answering every query involving
+    them without searching.
+
+    Each tree holds three int32 arrays over all people, 12 bytes a person:
+    about 12 MB per tree on a graph of a million people. Query counts are
+    kept for at most `request_capacity` people; past that every count is
+    halved and the people left at zero are forgotten, so counts favour
+    recent queries.
+    """
+
+    def __init__(self, capacity=10000, tree_capacity=8, hot_threshold=3,
+                 mode="bidirectional", request_capacity=100000):
+        self.paths = LRUCache(capacity)
+        self.trees = LRUCache(tree_capacity)
+        self.hot_threshold = hot_threshold
+        self.mode = mode
+        self.request_capacity = request_capacity
+        self.requests = Counter()
+        self.path_hits = 0
+        self.tree_hits = 0
+        self.misses = 0
+
+    def shortest_path(self, source, target):
+        """
+        Returns the same result as degrees.shortest_path(source, target).
+        """
+        if source == target:
+            return []
+
+        # Cached paths run from the smaller id of the pair to the larger
+        key = (source, target) if source <= target else (target, source)
+        path = self.paths.get(key, MISSING)
+        if path is not MISSING:
+            self.path_hits += 1
+            return path if key[0] == source else reverse_path(target, path)
+
+        path = self.tree_path(source, target)
+        if path is not MISSING:
+            self.tree_hits += 1
+        else:
+            self.misses += 1
+            path = degrees.shortest_path(source, target, mode=self.mode)
+        self.paths.put(key, path if key[0] == source
+                       else reverse_path(source, path))
+        return path
+
+    def tree_path(self, source, target):
+        """
+        Returns the path from a cached search tree of either person,
+        building the tree first if the person has become hot, or MISSING.
+        """
+        if degrees.graph is None:
+            return MISSING
+        self.requests.update((source, target))
+        if len(self.requests) > self.request_capacity:
+            self.decay_requests()
+        for root, other in ((source, target), (target, source)):
+            tree = self.trees.get(root)
+            if tree is None and self.requests[root] >= self.hot_threshold:
+                tree = degrees.graph.bfs_tree(degrees.graph.person_index[root])
+                self.trees.put(root, tree)
+            if tree is not None:
+                path = degrees.path_ids(
+                    tree.path(degrees.graph.person_index[other])
+                )
+                return path if root == source else reverse_path(target, path)
+        return MISSING
+
+    def decay_requests(self):
+        """
+        Halves every query count, forgetting the people left at zero.
+        """
+        self.requests = Counter({
+            person: count // 2 for person, count in self.requests.items()
+            if count > 1
+        })
+
+    def stats(self):
+        """
+        Returns a dictionary of hit, miss and eviction counters.
+        """
+        queries = self.path_hits + self.tree_hits + self.misses
+        return {
+            "queries": queries,
+            "path_hits": self.path_hits,
+            "tree_hits": self.tree_hits,
+            "misses": self.misses,
+            "hit_rate": (queries - self.misses) / queries if queries else 0.0,
+            "cached_paths": len(self.paths),
+            "cached_trees": len(self.trees),
+            "path_evictions": self.paths.evictions,
+            "tree_evictions": self.trees.evictions,
+        }
+
+    def clear(self):
+        """
+        Forgets every cached result, e.g. after loading different data.
+        """
+        self.paths.clear()
+        self.trees.clear()
+        self.requests.clear()
+
+
+def reverse_path(source, path):
+    """
+    Reverses a list of (movie_id, person_id) pairs leading away from
+    `source` into the pairs leading from its last person back to `source`.
+    """
+    if path is None:
+        return None
+    people = [source] + [person_id for _, person_id in path]
+    return [(path[i][0], people[i]) for i in reversed(range(len(path)))]
@@ -1,10 +1,13 @@
 import csv
+import math
 import sys
 
-from util import Node, StackFrontier, QueueFrontier
+from graph import NameIndex, load_graph
+from landmarks import load_index
+from util import Node, StackFrontier, QueueFrontier, PriorityFrontier
 
-# Maps names to a set of corresponding person_ids
-names = {}
+# NameIndex over people, used for lookups when the compact graph is not loaded
+name_index = None
 
 # Maps person_ids to a dictionary of: name, birth, movies (a set of movie_ids)
 people = {}
@@ -12,11 +15,33 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# Integer-indexed CompactGraph, used instead of people and movies when loaded
+graph = None
 
-def load_data(directory):
+# LandmarkIndex over the compact graph, used by the "alt" search mode
+landmark_index = None
+
+
+def load_data(directory, compact=False, snapshot=True, landmarks=0):
     """
     Load data from CSV files into memory.
+
+    If `compact` is true, the co-star graph is loaded into an
+    integer-indexed CompactGraph instead of the people and movies dicts,
+    reusing the binary snapshot next to the CSV files if `snapshot` is
+    true. With `landmarks` > 0, a landmark distance index with that
+    many landmarks is also loaded, or built and saved next to the CSVs.
     """
+    global graph, landmark_index, name_index
+    landmark_index = None
+    name_index = None
+    if compact:
+        graph = load_graph(directory, snapshot=snapshot)
+        if landmarks:
+            landmark_index = load_index(graph, directory, landmarks)
+        return
+    graph = None
+
     # Load people
     with open(f"{directory}/people.csv", encoding="utf-8") as f:
         reader = csv.DictReader(f)
@@ -26,10 +51,6 @@ def load_data(directory):
                 "birth": row["birth"],
                 "movies": set()
             }
-            if row["name"].lower() not in names:
-                names[row["name"].lower()] = {row["id"]}
-            else:
-                names[row["name"].lower()].add(row["id"])
 
     # Load movies
     with open(f"{directory}/movies.csv", encoding="utf-8") as f:
@@ -51,6 +72,9 @@ def load_data(directory):
             except KeyError:
                 pass
 
+    name_index = NameIndex(list(people),
+                           [person["name"] for person in people.values()])
+
 
 def main():
     if len(sys.argv) > 2:
@@ -59,7 +83,7 @@ def main():
 
     # Load data from files into memory
     print("Loading data...")
-    load_data(directory)
+    load_data(directory, compact=True)
     print("Data loaded.")
 
     source = person_id_for_name(input("Name: "))
@@ -69,7 +93,7 @@ def main():
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    path = shortest_path(source, target, mode="bidirectional")
 
     if path is None:
         print("Not connected.")
@@ -78,19 +102,139 @@ def main():
         print(f"{degrees} degrees of separation.")
         path = [(None, source)] + path
         for i in range(degrees):
-            person1 = people[path[i][1]]["name"]
-            person2 = people[path[i + 1][1]]["name"]
-            movie = movies[path[i + 1][0]]["title"]
+            person1 = person_info(path[i][1])["name"]
+            person2 = person_info(path[i + 1][1])["name"]
+            movie = movie_info(path[i + 1][0])["title"]
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
-def shortest_path(source, target):
+def shortest_path(source, target, mode="bfs"):
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
 
+    `mode` selects the search strategy: "bfs" for a breadth-first search
+    from the source, "bidirectional" to search from both ends at once,
+    "alt" for A* guided by landmark distances (needs the compact graph
+    loaded with landmarks).
+
     If no possible path, returns None.
     """
+    if mode == "bfs":
+        search = breadth_first_search
+    elif mode == "bidirectional":
+        search = bidirectional_search
+    elif mode == "alt":
+        if landmark_index is None:
+            raise ValueError("alt mode needs data loaded with landmarks")
+        search = alt_search
+    else:
+        raise ValueError(f"unknown search mode: {mode}")
+    if source == target:
+        return []
+
+    # Search the compact graph on integer indices, then map back to ids
+    if graph is not None:
+        return path_ids(search(graph.person_index[source],
+                               graph.person_index[target],
+                               graph.neighbors))
+    return search(source, target, neighbors_for_person)
+
+
+def shortest_paths_from(source, targets):
+    """
+    Returns a dictionary mapping each of `targets` to the shortest list of
+    (movie_id, person_id) pairs that connect the source to it, or None if
+    there is no path.
+
+    With the compact graph loaded, one search answers every target.
+    """
+    if graph is None:
+        return {target: shortest_path(source, target) for target in targets}
+    if not targets:
+        return {}
+    indices = {target: graph.person_index[target] for target in targets}
+    tree = graph.bfs_tree(graph.person_index[source], list(indices.values()))
+    return {target: path_ids(tree.path(index))
+            for target, index in indices.items()}
+
+
+def distance_bounds(source, target):
+    """
+    Returns (lower, upper) bounds on the degrees of separation between two
+    people from the landmark index, in time proportional to the number of
+    landmarks. Unknown bounds are math.inf.
+    """
+    if landmark_index is None:
+        raise ValueError("distance bounds need data loaded with landmarks")
+    return landmark_index.bounds(graph.person_index[source],
+                                 graph.person_index[target])
+
+
+def distance_layers(person_id, max_depth=None):
+    """
+    Returns a list of sets of person_ids, where the set at index d holds
+    everyone exactly d degrees of separation from the person.
+
+    If `max_depth` is given, people further away than that are left out.
+    """
+    layers = [{person_id}]
+    for layer in iter_layers(person_id, max_depth):
+        if graph is not None:
+            layer = {graph.person_ids[person] for person in layer.tolist()}
+        layers.append(layer)
+    return layers
+
+
+def degree_histogram(person_id, max_depth=None):
+    """
+    Returns a list whose entry at index d counts the people exactly d
+    degrees of separation from the person.
+    """
+    return [1] + [len(layer) for layer in iter_layers(person_id, max_depth)]
+
+
+def iter_layers(person_id, max_depth=None):
+    """
+    Yields the people at distance 1, 2, ... from the person, as arrays of
+    indices on the compact graph and as sets of person_ids otherwise.
+    Stops after `max_depth` layers or when nobody new is reachable.
+    """
+    if graph is not None:
+        yield from graph.bfs_layers(graph.person_index[person_id], max_depth)
+        return
+
+    explored = {person_id}
+    layer = {person_id}
+    depth = 0
+    while layer and (max_depth is None or depth < max_depth):
+        next_layer = set()
+        for person in layer:
+            for _, neighbor in neighbors_for_person(person):
+                if neighbor not in explored:
+                    explored.add(neighbor)
+                    next_layer.add(neighbor)
+        layer = next_layer
+        depth += 1
+        if layer:
+            yield layer
+
+
+def path_ids(path):
+    """
+    Maps a path of (movie, person) compact graph indices back to ids.
+    """
+    if path is None:
+        return None
+    return [(graph.movie_ids[movie], graph.person_ids[person])
+            for movie, person in path]
+
+
+def breadth_first_search(source, target, neighbors):
+    """
+    Single-ended breadth-first search from the source to the target,
+    where `neighbors(state)` returns (action, state) pairs.
+    """
     start = Node(state=source, parent=None, action=None)
     frontier = QueueFrontier()
     frontier.add(start)
@@ -106,7 +250,7 @@ def shortest_path(source, target):
         # Mark node as explored
         explored.add(node.state)
         # Add neighbors to frontier
-        for action, state in neighbors_for_person(node.state):
+        for action, state in neighbors(node.state):
             if not frontier.contains_state(state) and state not in explored:
                 child = Node(state=state, parent=node, action=action)
                 # If node is the goal, then we have a solution
@@ -122,19 +266,137 @@ def shortest_path(source, target):
                 frontier.add(child)
 
 
+def bidirectional_search(source, target, neighbors):
+    """
+    Breadth-first search growing from the source and the target at the
+    same time, always expanding whichever frontier is smaller by one
+    full layer. The two halves are spliced where the searches meet.
+    """
+    # Maps person_id to the (movie_id, person_id) it was reached from
+    forward = {source: None}
+    backward = {target: None}
+    forward_layer = [source]
+    backward_layer = [target]
+
+    while forward_layer and backward_layer:
+        if len(forward_layer) <= len(backward_layer):
+            forward_layer, meeting = expand_layer(
+                forward_layer, forward, backward, neighbors
+            )
+        else:
+            backward_layer, meeting = expand_layer(
+                backward_layer, backward, forward, neighbors
+            )
+        if meeting is not None:
+            return splice_path(forward, backward, meeting)
+    return None
 
-def person_id_for_name(name):
+
+def alt_search(source, target, neighbors):
+    """
+    A* search from the source to the target, using the landmark lower
+    bound on the remaining distance as the heuristic (ALT). Operates on
+    compact graph indices.
+    """
+    heuristic = landmark_index.heuristic(target)
+    h = heuristic([source])[0]
+    if h == math.inf:
+        return None
+
+    frontier = PriorityFrontier()
+    frontier.add(Node(state=source, parent=None, action=None), (h, 0))
+    cost = {source: 0}
+    explored = set()
+    while not frontier.empty():
+        node = frontier.remove()
+        if node.state == target:
+            path = []
+            while node.parent is not None:
+                path.append((node.action, node.state))
+                node = node.parent
+            path.reverse()
+            return path
+        # The heuristic is consistent, so the first visit is the cheapest
+        if node.state in explored:
+            continue
+        explored.add(node.state)
+
+        g = cost[node.state] + 1
+        children = [(action, state) for action, state in neighbors(node.state)
+                    if state not in explored
+                    and g < cost.get(state, math.inf)]
+        if not children:
+            continue
+        bounds = heuristic([state for _, state in children])
+        for (action, state), h in zip(children, bounds.tolist()):
+            if h == math.inf or g >= cost.get(state, math.inf):
+                continue
+            cost[state] = g
+            # Among equal estimates, prefer the deeper node
+            frontier.add(Node(state=state, parent=node, action=action),
+                         (g + h, -g))
+    return None
+
+
+def expand_layer(layer, parents, other_parents, neighbors):
+    """
+    Expands every person in `layer` by one step, recording parents.
+
+    Returns the next layer and the first person also reached by the
+    opposite search, or None if the searches have not met yet.
+    """
+    next_layer = []
+    for person_id in layer:
+        for movie_id, neighbor in neighbors(person_id):
+            if neighbor in parents:
+                continue
+            parents[neighbor] = (movie_id, person_id)
+            # The first meeting lies on a shortest path: every person the
+            # other side reached earlier has already been seen from here
+            if neighbor in other_parents:
+                return next_layer, neighbor
+            next_layer.append(neighbor)
+    return next_layer, None
+
+
+def splice_path(forward, backward, meeting):
+    """
+    Joins the forward and backward parent chains at `meeting` into a
+    list of (movie_id, person_id) pairs from source to target.
+    """
+    path = []
+    person_id = meeting
+    while forward[person_id] is not None:
+        movie_id, previous = forward[person_id]
+        path.append((movie_id, person_id))
+        person_id = previous
+    path.reverse()
+
+    person_id = meeting
+    while backward[person_id] is not None:
+        movie_id, following = backward[person_id]
+        path.append((movie_id, following))
+        person_id = following
+    return path
+
+
+def person_id_for_name(name, policy=None):
     """
     Returns the IMDB id for a person's name,
     resolving ambiguities as needed.
+
+    By default the user is asked which person was intended. A `policy`
+    from DISAMBIGUATION_POLICIES picks one without asking instead.
     """
-    person_ids = list(names.get(name.lower(), set()))
+    person_ids = list(ids_for_name(name))
     if len(person_ids) == 0:
         return None
+    elif len(person_ids) > 1 and policy is not None:
+        return DISAMBIGUATION_POLICIES[policy](person_ids)
     elif len(person_ids) > 1:
         print(f"Which '{name}'?")
         for person_id in person_ids:
-            person = people[person_id]
+            person = person_info(person_id)
             name = person["name"]
             birth = person["birth"]
             print(f"ID: {person_id}, Name: {name}, Birth: {birth}")
@@ -149,11 +411,49 @@ def person_id_for_name(name):
         return person_ids[0]
 
 
+def most_films(person_ids):
+    """
+    Picks the person who starred in the most movies, then the earliest born.
+    """
+    return min(person_ids, key=lambda person_id: (
+        -film_count(person_id), birth_key(person_id), person_id
+    ))
+
+
+def earliest_birth(person_ids):
+    """
+    Picks the earliest born person, then the one in the most movies.
+    """
+    return min(person_ids, key=lambda person_id: (
+        birth_key(person_id), -film_count(person_id), person_id
+    ))
+
+
+def birth_key(person_id):
+    """
+    Returns a sort key for a person's birth year, unknown years last.
+    """
+    birth = person_info(person_id)["birth"]
+    return int(birth) if birth.isdigit() else math.inf
+
+
+# Non-interactive ways for person_id_for_name to resolve ambiguous names
+DISAMBIGUATION_POLICIES = {
+    "most_films": most_films,
+    "earliest_birth": earliest_birth,
+}
+
+
 def neighbors_for_person(person_id):
     """
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
     """
+    if graph is not None:
+        return {(graph.movie_ids[movie], graph.person_ids[person])
+                for movie, person in graph.neighbors(
+                    graph.person_index[person_id])}
+
     movie_ids = people[person_id]["movies"]
     neighbors = set()
     for movie_id in movie_ids:
@@ -162,5 +462,61 @@ def neighbors_for_person(person_id):
     return neighbors
 
 
+def is_person(person_id):
+    """
+    Returns True if `person_id` is a known person.
+    """
+    if graph is not None:
+        return person_id in graph.person_index
+    return person_id in people
+
+
+def ids_for_name(name):
+    """
+    Returns the set of person_ids with a given name, ignoring case,
+    accents and repeated whitespace.
+    """
+    index = graph.name_index if graph is not None else name_index
+    return set(index.find(name))
+
+
+def ids_for_prefix(prefix, limit=10):
+    """
+    Returns up to `limit` person_ids whose name starts with `prefix`,
+    ignoring case, accents and repeated whitespace, in name order.
+    """
+    index = graph.name_index if graph is not None else name_index
+    return index.find_prefix(prefix, limit)
+
+
+def film_count(person_id):
+    """
+    Returns the number of movies a person starred in.
+    """
+    if graph is not None:
+        return graph.film_count(graph.person_index[person_id])
+    return len(people[person_id]["movies"])
+
+
+def person_info(person_id):
+    """
+    Returns a dictionary with the name and birth of a person.
+    """
+    if graph is not None:
+        i = graph.person_index[person_id]
+        return {"name": graph.names[i], "birth": graph.births[i]}
+    return people[person_id]
+
+
+def movie_info(movie_id):
+    """
+    Returns a dictionary with the title and year of a movie.
+    """
+    if graph is not None:
+        i = graph.movie_index[movie_id]
+        return {"title": graph.titles[i], "year": graph.years[i]}
+    return movies[movie_id]
+
+
 if __name__ == "__main__":
     main()
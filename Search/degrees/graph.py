@@ -0,0 +1,828 @@
+import csv
+import gc
+import itertools
+import json
+import os
+import sys
+import time
+import unicodedata
+from array import array
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows; peak memory is then not reported
+    resource = None
+
+# Bumped whenever the snapshot layout changes, invalidating old snapshots
+SNAPSHOT_VERSION = 3
+SNAPSHOT_DIRECTORY = "degrees.snapshot"
+SOURCES = ("people.csv", "movies.csv", "stars.csv")
+ARRAYS = ("person_indptr", "person_movies", "movie_indptr", "movie_stars",
+          "person_order", "movie_order", "name_order")
+STRINGS = ("person_ids", "names", "births", "movie_ids", "titles", "years")
+DETAILS = ("names", "births", "titles", "years")
+
+# Rows parsed per chunk by the streaming CSV loader
+CHUNK_SIZE = 100000
+
+
+def main():
+    if len(sys.argv) not in [2, 3] or sys.argv[2:] not in [[], ["graph"]]:
+        sys.exit("Usage: python graph.py directory [graph]")
+    directory = sys.argv[1]
+    graph_only = len(sys.argv) == 3
+
+    stats = {}
+    graph = parse_csv(directory, graph_only=graph_only, stats=stats)
+    for name in SOURCES:
+        rows, seconds = stats[name]["rows"], stats[name]["seconds"]
+        print(f"{name}: {rows} rows in {seconds:.2f}s "
+              f"({rows / max(seconds, 1e-9):,.0f} rows/s)")
+    print(f"{graph.num_people} people, {graph.num_movies} movies, "
+          f"{len(graph.person_movies)} roles")
+    if stats["peak_memory"] is not None:
+        print(f"Peak memory: {stats['peak_memory'] / 2 ** 20:.1f} MiB")
+
+
+class CompactGraph():
+    """
+    Integer-indexed co-star graph stored as a compressed sparse row
+    bipartite adjacency.
+
+    People and movies are interned to dense indices. The movies of person
+    `p` are `person_movies[person_indptr[p]:person_indptr[p + 1]]` and the
+    stars of movie `m` are `movie_stars[movie_indptr[m]:movie_indptr[m + 1]]`.
+    """
+
+    def __init__(self, person_ids, names, births, movie_ids, titles, years,
+                 person_indptr, person_movies, movie_indptr, movie_stars,
+                 person_order=None, movie_order=None, name_order=None):
+        self.person_ids = person_ids
+        self.names = names
+        self.births = births
+        self.movie_ids = movie_ids
+        self.titles = titles
+        self.years = years
+        self.person_indptr = person_indptr
+        self.person_movies = person_movies
+        self.movie_indptr = movie_indptr
+        self.movie_stars = movie_stars
+        self.person_index = SortedIndex(person_ids, person_order)
+        self.movie_index = SortedIndex(movie_ids, movie_order)
+        self.name_index = NameIndex(person_ids, names, name_order)
+
+    @property
+    def num_people(self):
+        return len(self.person_ids)
+
+    @property
+    def num_movies(self):
+        return len(self.movie_ids)
+
+    def movies_of(self, person):
+        """Returns the movie indices a person starred in."""
+        return self.person_movies[
+            self.person_indptr[person]:self.person_indptr[person + 1]
+        ]
+
+    def stars_of(self, movie):
+        """Returns the person indices who starred in a movie."""
+        return self.movie_stars[
+            self.movie_indptr[movie]:self.movie_indptr[movie + 1]
+        ]
+
+    def neighbors(self, person):
+        """
+        Returns (movie, person) index pairs for people who starred
+        with a given person.
+        """
+        movies = self.movies_of(person)
+        movie_rows, stars = gather(self.movie_indptr, self.movie_stars, movies)
+        return list(zip(movies[movie_rows].tolist(), stars.tolist()))
+
+    def bfs_layers(self, source, max_depth=None, tree=None):
+        """
+        Breadth-first search from `source` that expands one full layer at a
+        time with array operations, yielding the array of people at
+        distance 1, 2, ... up to `max_depth`.
+
+        Parents and distances are recorded in `tree` if one is given.
+        Stopping iteration early ends the search.
+        """
+        if tree is None:
+            tree = SearchTree(source, self.num_people)
+        movie_seen = np.zeros(self.num_movies, dtype=bool)
+        frontier = np.array([source], dtype=np.int32)
+        depth = 0
+        while len(frontier) and (max_depth is None or depth < max_depth):
+            # Movies of the frontier not expanded by an earlier layer
+            rows, movies = gather(
+                self.person_indptr, self.person_movies, frontier
+            )
+            fresh = ~movie_seen[movies]
+            movies, first = np.unique(movies[fresh], return_index=True)
+            via = frontier[rows[fresh][first]]
+            movie_seen[movies] = True
+
+            # Stars of those movies not reached yet form the next layer
+            rows, stars = gather(self.movie_indptr, self.movie_stars, movies)
+            fresh = tree.distance[stars] < 0
+            stars, first = np.unique(stars[fresh], return_index=True)
+            rows = rows[fresh][first]
+            depth += 1
+            tree.distance[stars] = depth
+            tree.parent_movie[stars] = movies[rows]
+            tree.parent_person[stars] = via[rows]
+            frontier = stars.astype(np.int32)
+            if len(frontier):
+                yield frontier
+
+    def bfs_tree(self, source, targets=None, max_depth=None):
+        """
+        Returns the SearchTree of a breadth-first search from `source`.
+
+        If `targets` is given, stops as soon as every target is reached,
+        so an empty list of targets returns before searching.
+        """
+        tree = SearchTree(source, self.num_people)
+        pending = None if targets is None else np.asarray(targets, dtype=np.int64)
+        if pending is not None and (tree.distance[pending] >= 0).all():
+            return tree
+        for _ in self.bfs_layers(source, max_depth, tree):
+            if pending is not None and (tree.distance[pending] >= 0).all():
+                break
+        return tree
+
+    def film_count(self, person):
+        """Returns the number of movies a person starred in."""
+        return int(self.person_indptr[person + 1] - self.person_indptr[person])
+
+
+class SearchTree():
+    """
+    Breadth-first search tree over person indices: the distance from the
+    source and the (movie, person) each person was first reached from.
+    Unreached people have distance -1.
+    """
+
+    def __init__(self, source, num_people):
+        self.source = source
+        self.distance = np.full(num_people, -1, dtype=np.int32)
+        self.parent_movie = np.full(num_people, -1, dtype=np.int32)
+        self.parent_person = np.full(num_people, -1, dtype=np.int32)
+        self.distance[source] = 0
+
+    def path(self, target):
+        """
+        Returns the list of (movie, person) index pairs that connect the
+        source to `target`, or None if `target` was not reached.
+        """
+        if self.distance[target] < 0:
+            return None
+        path = []
+        person = target
+        while person != self.source:
+            path.append((int(self.parent_movie[person]), int(person)))
+            person = self.parent_person[person]
+        path.reverse()
+        return path
+
+
+class StringTable():
+    """
+    Read-only sequence of strings stored as one UTF-8 buffer and an array
+    of offsets, so it can be saved and memory-mapped without pickling.
+    """
+
+    def __init__(self, data, offsets):
+        self.data = data
+        self.offsets = offsets
+
+    @classmethod
+    def from_strings(cls, strings):
+        builder = StringTableBuilder()
+        for s in strings:
+            builder.append(s)
+        return builder.build()
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        start, end = self.offsets[i], self.offsets[i + 1]
+        return self.data[start:end].tobytes().decode("utf-8")
+
+    def __iter__(self):
+        # Decoding from one bytes copy is much faster than item by item
+        data = self.data.tobytes()
+        offsets = self.offsets.tolist()
+        for start, end in zip(offsets, offsets[1:]):
+            yield data[start:end].decode("utf-8")
+
+
+class StringTableBuilder():
+    """
+    Appends strings straight into the buffers of a StringTable, so no
+    Python string object is kept per row while loading.
+    """
+
+    def __init__(self):
+        self.data = bytearray()
+        self.offsets = array("q", [0])
+
+    def append(self, s):
+        self.data += s.encode("utf-8")
+        self.offsets.append(len(self.data))
+
+    def extend(self, strings):
+        encoded = [s.encode("utf-8") for s in strings]
+        end = len(self.data)
+        self.data += b"".join(encoded)
+        self.offsets.extend(itertools.accumulate(
+            [len(b) for b in encoded], initial=end
+        ))
+        # accumulate repeats the starting offset, which is already stored
+        self.offsets.pop(len(self.offsets) - len(encoded) - 1)
+
+    def build(self):
+        return StringTable(np.frombuffer(self.data, dtype=np.uint8),
+                           np.frombuffer(self.offsets, dtype=np.int64))
+
+
+class CodedStrings():
+    """
+    Read-only sequence of strings with few distinct values, such as years,
+    stored as a StringTable of the distinct values and an array of codes.
+    """
+
+    def __init__(self, values, codes):
+        self.values = values
+        self.codes = codes
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, i):
+        return self.values[self.codes[i]]
+
+
+class CodedStringsBuilder():
+    """
+    Appends strings to a CodedStrings, storing each distinct value once.
+    """
+
+    def __init__(self):
+        self.values = StringTableBuilder()
+        self.codes = array("i")
+        self.lookup = {}
+
+    def append(self, s):
+        code = self.lookup.get(s)
+        if code is None:
+            code = self.lookup[s] = len(self.lookup)
+            self.values.append(s)
+        self.codes.append(code)
+
+    def extend(self, strings):
+        for s in strings:
+            self.append(s)
+
+    def build(self):
+        return CodedStrings(self.values.build(),
+                            np.frombuffer(self.codes, dtype=np.int32))
+
+
+class BlankStrings():
+    """
+    Sequence of empty strings, standing in for names, births, titles and
+    years when only the graph is loaded.
+    """
+
+    def __init__(self, length):
+        self.length = length
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, i):
+        if not -self.length <= i < self.length:
+            raise IndexError("BlankStrings index out of range")
+        return ""
+
+    def __iter__(self):
+        return itertools.repeat("", self.length)
+
+
+class IdMap():
+    """
+    Assigns dense indices to ids in the order they are added, and maps
+    chunks of ids back to indices.
+
+    Decimal ids, as in IMDb, are kept as one int64 each and looked up by
+    binary search; any other id switches to a dictionary.
+    """
+
+    def __init__(self):
+        self.table = StringTableBuilder()
+        self.keys = array("q")
+        self.lookup = None
+        self.sorted_keys = None
+
+    def extend(self, ids):
+        if self.lookup is None:
+            keys = decimal_keys(ids)
+            if (keys >= 0).all():
+                self.keys.frombytes(keys.tobytes())
+                self.table.extend(ids)
+                return
+            self.lookup = {str(key): i for i, key in enumerate(self.keys)}
+        start = len(self)
+        for i, id in enumerate(ids):
+            self.lookup.setdefault(id, start + i)
+        self.table.extend(ids)
+
+    def __len__(self):
+        return len(self.table.offsets) - 1
+
+    def indices(self, ids):
+        """
+        Returns an int64 array with the index of each id, or -1 for
+        unknown ids.
+        """
+        if self.lookup is not None:
+            return np.array([self.lookup.get(id, -1) for id in ids],
+                            dtype=np.int64)
+
+        if self.sorted_keys is None:
+            keys = np.frombuffer(self.keys, dtype=np.int64)
+            self.order = np.argsort(keys, kind="stable")
+            self.sorted_keys = keys[self.order]
+        keys = decimal_keys(ids)
+        positions = np.searchsorted(self.sorted_keys, keys)
+        positions[positions == len(self.sorted_keys)] = 0
+        found = ((self.sorted_keys[positions] == keys) if len(positions)
+                 and len(self.sorted_keys) else np.zeros(len(keys), bool))
+        return np.where(found, self.order[positions], -1)
+
+
+def decimal_keys(ids):
+    """
+    Returns an int64 array of the ids written in canonical decimal, with
+    -1 for any other id (leading zeros, other characters, or too long).
+    """
+    joined = "".join(ids)
+    lengths = list(map(len, ids))
+    if (joined.isascii() and joined.isdigit() and min(lengths, default=1)
+            and max(lengths, default=0) < 19
+            and not any(id[0] == "0" and len(id) > 1 for id in ids)):
+        return np.fromiter(map(int, ids), dtype=np.int64, count=len(ids))
+    return np.array([decimal_key(id) for id in ids], dtype=np.int64)
+
+
+def decimal_key(id):
+    """
+    Returns one id written in canonical decimal as an int, or -1.
+    """
+    if (id.isascii() and id.isdigit() and len(id) < 19
+            and (id[0] != "0" or id == "0")):
+        return int(id)
+    return -1
+
+
+class SortedIndex():
+    """
+    Maps strings back to their positions in a sequence by binary search
+    over `order`, a permutation that sorts the normalized strings. If no
+    order is given, it is computed on first use.
+    """
+
+    def __init__(self, strings, order=None, normalize=None):
+        self.strings = strings
+        self.normalize = normalize
+        self.sorted_order = order
+
+    @property
+    def order(self):
+        if self.sorted_order is None:
+            keys = list(self.strings)
+            if self.normalize is not None:
+                keys = [self.normalize(key) for key in keys]
+            self.sorted_order = np.array(
+                sorted(range(len(keys)), key=keys.__getitem__), dtype=np.int64
+            )
+        return self.sorted_order
+
+    def key_at(self, i):
+        s = self.strings[i]
+        return s if self.normalize is None else self.normalize(s)
+
+    def lower_bound(self, key):
+        """Returns the first position in `order` whose key is >= `key`."""
+        low, high = 0, len(self.order)
+        while low < high:
+            middle = (low + high) // 2
+            if self.key_at(int(self.order[middle])) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def find(self, key):
+        """Returns the positions of every string whose key equals `key`."""
+        return self.find_prefix(key, exact=True)
+
+    def find_prefix(self, prefix, limit=None, exact=False):
+        """
+        Returns the positions of strings whose key starts with `prefix`,
+        in key order, at most `limit` of them.
+        """
+        positions = []
+        low = self.lower_bound(prefix)
+        while low < len(self.order) and (limit is None
+                                         or len(positions) < limit):
+            i = int(self.order[low])
+            key = self.key_at(i)
+            if key != prefix and (exact or not key.startswith(prefix)):
+                break
+            positions.append(i)
+            low += 1
+        return positions
+
+    def get(self, key, default=None):
+        positions = self.find(key)
+        return positions[0] if positions else default
+
+    def __getitem__(self, key):
+        positions = self.find(key)
+        if not positions:
+            raise KeyError(key)
+        return positions[0]
+
+    def __contains__(self, key):
+        return bool(self.find(key))
+
+
+class NameIndex():
+    """
+    Sorted index of person names for exact and prefix lookups that ignore
+    case, accents and repeated whitespace.
+    """
+
+    def __init__(self, person_ids, names, order=None):
+        self.person_ids = person_ids
+        self.index = SortedIndex(names, order, normalize=normalize_name)
+
+    @property
+    def order(self):
+        return self.index.order
+
+    def find(self, name):
+        """Returns the person_ids whose name matches `name`."""
+        return [self.person_ids[i]
+                for i in self.index.find(normalize_name(name))]
+
+    def find_prefix(self, prefix, limit=None):
+        """
+        Returns the person_ids whose name starts with `prefix`, in name
+        order, at most `limit` of them.
+        """
+        return [self.person_ids[i]
+                for i in self.index.find_prefix(normalize_name(prefix),
+                                                limit)]
+
+
+def normalize_name(name):
+    """
+    Returns the lookup key for a name: accents stripped, case folded and
+    whitespace collapsed.
+    """
+    if name.isascii():
+        return " ".join(name.lower().split())
+    decomposed = unicodedata.normalize("NFKD", name)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(stripped.casefold().split())
+
+
+def gather(indptr, data, rows):
+    """
+    Concatenates the CSR rows `rows` of (`indptr`, `data`).
+
+    Returns the position in `rows` each value came from, and the values.
+    """
+    starts = indptr[rows]
+    lengths = indptr[rows + 1] - starts
+    origin = np.repeat(np.arange(len(rows)), lengths)
+    # Offset of every output slot within its own row
+    offsets = np.arange(len(origin)) - np.repeat(
+        np.cumsum(lengths) - lengths, lengths
+    )
+    return origin, data[starts[origin] + offsets]
+
+
+def build_csr(rows, columns, num_rows):
+    """
+    Builds (indptr, data) for the unique (row, column) edges given as
+    parallel arrays.
+    """
+    order = np.lexsort((columns, rows))
+    rows = rows[order]
+    columns = columns[order]
+    if len(rows):
+        keep = np.ones(len(rows), dtype=bool)
+        keep[1:] = (rows[1:] != rows[:-1]) | (columns[1:] != columns[:-1])
+        rows = rows[keep]
+        columns = columns[keep]
+    indptr = np.zeros(num_rows + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=num_rows), out=indptr[1:])
+    return indptr, columns.astype(np.int32)
+
+
+def load_graph(directory, snapshot=True, graph_only=False,
+               chunk_size=CHUNK_SIZE):
+    """
+    Load data from CSV files into a CompactGraph.
+
+    If `snapshot` is true, a binary snapshot is kept next to the CSV files
+    and reused while the CSV files are unchanged. If `graph_only` is true,
+    names, births, titles and years are not loaded.
+    """
+    if snapshot:
+        graph = read_snapshot(directory, graph_only)
+        if graph is not None:
+            return graph
+
+    graph = parse_csv(directory, chunk_size, graph_only)
+    if snapshot:
+        try:
+            write_snapshot(graph, directory)
+        except OSError:
+            # A read-only dataset directory just means no snapshot
+            pass
+    return graph
+
+
+def parse_csv(directory, chunk_size=CHUNK_SIZE, graph_only=False,
+              stats=None):
+    """
+    Parse the people, movies and stars CSV files into a CompactGraph,
+    streaming `chunk_size` rows at a time.
+
+    Only the ids and the stars are kept if `graph_only` is true. If a
+    `stats` dictionary is given, it is filled with the rows and seconds
+    taken per file and the process's peak memory in bytes.
+    """
+    if stats is None:
+        stats = {}
+
+    # Rows are short-lived lists and tuples that never form cycles, but
+    # creating so many makes the cyclic collector rescan everything alive
+    collecting = gc.isenabled()
+    gc.disable()
+    try:
+        return parse_chunks(directory, chunk_size, graph_only, stats)
+    finally:
+        if collecting:
+            gc.enable()
+
+
+def parse_chunks(directory, chunk_size, graph_only, stats):
+    """
+    Does the work of parse_csv.
+    """
+    # Load people
+    people = IdMap()
+    names = StringTableBuilder()
+    births = CodedStringsBuilder()
+    columns = ["id"] if graph_only else ["id", "name", "birth"]
+    with Timer(stats, "people.csv") as timer:
+        for chunk in read_chunks(f"{directory}/people.csv", columns,
+                                 chunk_size):
+            timer.rows += len(chunk[0])
+            people.extend(chunk[0])
+            if not graph_only:
+                names.extend(chunk[1])
+                births.extend(chunk[2])
+
+    # Load movies
+    movies = IdMap()
+    titles = StringTableBuilder()
+    years = CodedStringsBuilder()
+    columns = ["id"] if graph_only else ["id", "title", "year"]
+    with Timer(stats, "movies.csv") as timer:
+        for chunk in read_chunks(f"{directory}/movies.csv", columns,
+                                 chunk_size):
+            timer.rows += len(chunk[0])
+            movies.extend(chunk[0])
+            if not graph_only:
+                titles.extend(chunk[1])
+                years.extend(chunk[2])
+
+    # Load stars, skipping rows that refer to unknown people or movies
+    edge_people = array("i")
+    edge_movies = array("i")
+    with Timer(stats, "stars.csv") as timer:
+        for chunk in read_chunks(f"{directory}/stars.csv",
+                                 ["person_id", "movie_id"], chunk_size):
+            timer.rows += len(chunk[0])
+            person = people.indices(chunk[0])
+            movie = movies.indices(chunk[1])
+            known = (person >= 0) & (movie >= 0)
+            edge_people.frombytes(person[known].astype(np.int32).tobytes())
+            edge_movies.frombytes(movie[known].astype(np.int32).tobytes())
+    edge_people = np.frombuffer(edge_people, dtype=np.int32)
+    edge_movies = np.frombuffer(edge_movies, dtype=np.int32)
+
+    num_people = len(people)
+    num_movies = len(movies)
+    person_indptr, person_movies = build_csr(
+        edge_people, edge_movies, num_people
+    )
+    movie_indptr, movie_stars = build_csr(
+        edge_movies, edge_people, num_movies
+    )
+
+    if graph_only:
+        names, births = BlankStrings(num_people), BlankStrings(num_people)
+        titles, years = BlankStrings(num_movies), BlankStrings(num_movies)
+    else:
+        names, births = names.build(), births.build()
+        titles, years = titles.build(), years.build()
+    graph = CompactGraph(
+        people.table.build(), names, births,
+        movies.table.build(), titles, years,
+        person_indptr, person_movies, movie_indptr, movie_stars
+    )
+    stats["peak_memory"] = peak_memory()
+    return graph
+
+
+def read_chunks(filename, columns, chunk_size):
+    """
+    Yields up to `chunk_size` rows of a CSV file at a time, as a list
+    holding one tuple of values per name in `columns`. Blank lines are
+    skipped, like csv.DictReader does.
+    """
+    with open(filename, encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        positions = [header.index(column) for column in columns]
+        width = max(positions) + 1
+        while True:
+            read = 0
+            rows = []
+            for row in itertools.islice(reader, chunk_size):
+                read += 1
+                if not row:
+                    continue
+                if len(row) < width:
+                    raise ValueError(f"{filename}:{reader.line_num}: "
+                                     f"expected {width} columns, got {len(row)}")
+                rows.append(row)
+            if not read:
+                return
+            if rows:
+                values = list(zip(*rows))
+                yield [values[i] for i in positions]
+
+
+class Timer():
+    """
+    Context manager recording the rows counted and the seconds taken for
+    one file into `stats[name]`.
+    """
+
+    def __init__(self, stats, name):
+        self.stats = stats
+        self.name = name
+        self.rows = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stats[self.name] = {
+            "rows": self.rows,
+            "seconds": time.perf_counter() - self.start,
+        }
+
+
+def peak_memory():
+    """
+    Returns the peak resident memory of this process in bytes, or None if
+    it cannot be measured.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def source_stamps(directory):
+    """
+    Returns the size and modification time of each CSV file.
+    """
+    stamps = {}
+    for name in SOURCES:
+        stat = os.stat(os.path.join(directory, name))
+        stamps[name] = [stat.st_size, stat.st_mtime_ns]
+    return stamps
+
+
+def write_snapshot(graph, directory):
+    """
+    Write a CompactGraph as a directory of .npy arrays next to the CSVs.
+
+    The metadata file is written last, so an interrupted write leaves a
+    snapshot that read_snapshot rejects.
+    """
+    path = os.path.join(directory, SNAPSHOT_DIRECTORY)
+    os.makedirs(path, exist_ok=True)
+    meta_path = os.path.join(path, "meta.json")
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+
+    arrays = {
+        "person_indptr": graph.person_indptr,
+        "person_movies": graph.person_movies,
+        "movie_indptr": graph.movie_indptr,
+        "movie_stars": graph.movie_stars,
+        "person_order": graph.person_index.order,
+        "movie_order": graph.movie_index.order,
+    }
+    # Without names there is nothing to sort for the name index
+    graph_only = isinstance(graph.names, BlankStrings)
+    if not graph_only:
+        arrays["name_order"] = graph.name_index.order
+    for name in STRINGS:
+        table = getattr(graph, name)
+        if isinstance(table, BlankStrings):
+            continue
+        if isinstance(table, CodedStrings):
+            arrays[f"{name}_codes"] = table.codes
+            table = table.values
+        elif not isinstance(table, StringTable):
+            table = StringTable.from_strings(table)
+        arrays[f"{name}_data"] = table.data
+        arrays[f"{name}_offsets"] = table.offsets
+    for name, values in arrays.items():
+        np.save(os.path.join(path, f"{name}.npy"), values)
+
+    meta = {
+        "version": SNAPSHOT_VERSION,
+        "sources": source_stamps(directory),
+        "graph_only": graph_only,
+    }
+    with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(meta_path + ".tmp", meta_path)
+
+
+def read_snapshot(directory, graph_only=False):
+    """
+    Memory-map a CompactGraph from its snapshot.
+
+    Returns None if there is no snapshot, it was written by another
+    SNAPSHOT_VERSION, the CSV files changed since it was written, or it
+    lacks the names and titles while `graph_only` is false.
+    """
+    path = os.path.join(directory, SNAPSHOT_DIRECTORY)
+    try:
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        if (meta.get("version") != SNAPSHOT_VERSION
+                or meta.get("sources") != source_stamps(directory)
+                or (meta.get("graph_only") and not graph_only)):
+            return None
+
+        def load(name):
+            return np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+
+        arrays = {name: load(name) for name in ARRAYS
+                  if not (meta["graph_only"] and name == "name_order")}
+        strings = {}
+        for name in STRINGS:
+            if meta["graph_only"] and name in DETAILS:
+                continue
+            strings[name] = StringTable(load(f"{name}_data"),
+                                        load(f"{name}_offsets"))
+            if os.path.exists(os.path.join(path, f"{name}_codes.npy")):
+                strings[name] = CodedStrings(strings[name],
+                                             load(f"{name}_codes"))
+    except (OSError, ValueError, KeyError):
+        return None
+
+    if meta["graph_only"]:
+        num_people = len(strings["person_ids"])
+        num_movies = len(strings["movie_ids"])
+        strings["names"] = strings["births"] = BlankStrings(num_people)
+        strings["titles"] = strings["years"] = BlankStrings(num_movies)
+    return CompactGraph(**strings, **arrays)
+
+
+if __name__ == "__main__":
+    main()
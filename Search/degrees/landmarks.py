@@ -0,0 +1,147 @@
+import json
+import math
+import os
+import sys
+
+import numpy as np
+
+from graph import load_graph, source_stamps
+
+LANDMARK_FILE = "degrees.landmarks.npz"
+
+# Distance recorded for people a landmark cannot reach
+UNREACHABLE = -1
+
+
+def main():
+    if len(sys.argv) not in [2, 3]:
+        sys.exit("Usage: python landmarks.py directory [k]")
+    directory = sys.argv[1]
+    k = int(sys.argv[2]) if len(sys.argv) == 3 else 16
+
+    print("Loading data...")
+    graph = load_graph(directory)
+    print("Data loaded.")
+    index = build_index(graph, k)
+    save_index(index, directory)
+    names = ", ".join(graph.names[i] for i in index.landmarks.tolist())
+    print(f"Saved {len(index.landmarks)} landmarks: {names}")
+
+
+class LandmarkIndex():
+    """
+    Breadth-first distances from a few landmark people to everyone, which
+    bound the distance between any two people by the triangle inequality.
+
+    `distances[i, p]` is the distance from landmark i to person p, or
+    UNREACHABLE.
+    """
+
+    def __init__(self, landmarks, distances):
+        self.landmarks = landmarks
+        self.distances = distances
+
+    def bounds(self, source, target):
+        """
+        Returns (lower, upper) bounds on the distance between two person
+        indices in O(k). Either bound may be math.inf.
+        """
+        ds = self.distances[:, source].astype(np.int64)
+        dt = self.distances[:, target].astype(np.int64)
+        reached_s = ds != UNREACHABLE
+        reached_t = dt != UNREACHABLE
+        # A landmark reaching only one of them puts them in different
+        # components
+        if (reached_s != reached_t).any():
+            return math.inf, math.inf
+        both = reached_s & reached_t
+        if not both.any():
+            return 0, math.inf
+        lower = int(np.abs(ds[both] - dt[both]).max())
+        upper = int((ds[both] + dt[both]).min())
+        return lower, upper
+
+    def heuristic(self, target):
+        """
+        Returns a function mapping an array of person indices to lower
+        bounds on their distances to `target`. The bound is consistent, so
+        A* with it finds shortest paths.
+        """
+        dt = self.distances[:, target].astype(np.int64)[:, np.newaxis]
+        reached_t = dt != UNREACHABLE
+
+        def lower_bounds(people):
+            ds = self.distances[:, people].astype(np.int64)
+            reached_s = ds != UNREACHABLE
+            gaps = np.where(reached_s & reached_t, np.abs(ds - dt), 0)
+            bounds = gaps.max(axis=0, initial=0).astype(float)
+            bounds[(reached_s != reached_t).any(axis=0)] = math.inf
+            return bounds
+
+        return lower_bounds
+
+
+def choose_landmarks(graph, k):
+    """
+    Returns the indices of the k people who starred in the most movies.
+    """
+    counts = np.diff(graph.person_indptr)
+    k = min(k, graph.num_people)
+    top = np.argpartition(-counts, k - 1)[:k] if k else np.array([], int)
+    return top[np.argsort(-counts[top], kind="stable")].astype(np.int32)
+
+
+def build_index(graph, k=16):
+    """
+    Runs one breadth-first search per landmark and returns a LandmarkIndex.
+    """
+    landmarks = choose_landmarks(graph, k)
+    distances = np.full((len(landmarks), graph.num_people), UNREACHABLE,
+                        dtype=np.int16)
+    for i, landmark in enumerate(landmarks.tolist()):
+        distances[i] = graph.bfs_tree(landmark).distance
+    return LandmarkIndex(landmarks, distances)
+
+
+def save_index(index, directory):
+    """
+    Saves a LandmarkIndex next to the CSV files it was built from.
+    """
+    meta = json.dumps({"sources": source_stamps(directory)})
+    np.savez(os.path.join(directory, LANDMARK_FILE), meta=np.array(meta),
+             landmarks=index.landmarks, distances=index.distances)
+
+
+def read_index(directory):
+    """
+    Reads the saved LandmarkIndex for a dataset, or returns None if there
+    is none or the CSV files changed since it was built.
+    """
+    try:
+        with np.load(os.path.join(directory, LANDMARK_FILE)) as data:
+            meta = json.loads(str(data["meta"]))
+            if meta.get("sources") != source_stamps(directory):
+                return None
+            return LandmarkIndex(data["landmarks"], data["distances"])
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def load_index(graph, directory, k=16):
+    """
+    Returns the saved LandmarkIndex with at least k landmarks, building
+    and saving a new one if needed.
+    """
+    index = read_index(directory)
+    if index is not None and len(index.landmarks) >= k:
+        return index
+    index = build_index(graph, k)
+    try:
+        save_index(index, directory)
+    except OSError:
+        pass
+    return index
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Tic Tac Toe Player on bitboards
+
+A board is a pair of 9-bit integers (x, o), one per player, where bit
+3 * i + j is set when that player holds cell (i, j).
+"""
+
+X = "X"
+O = "O"
+EMPTY = None
+
+FULL = 0b111111111
+
+# Bit masks of the eight winning lines: rows, columns and diagonals
+WIN_MASKS = (
+    0b000000111, 0b000111000, 0b111000000,
+    0b001001001, 0b010010010, 0b100100100,
+    0b100010001, 0b001010100,
+)
+
+# Whether each 9-bit pattern of one player's cells contains a full line
+WINNING = tuple(
+    any(cells & mask == mask for mask in WIN_MASKS) for cells in range(512)
+)
+
+# Number of cells set in each 9-bit pattern
+COUNTS = tuple(bin(cells).count("1") for cells in range(512))
+
+# Cell bits in the order actions are searched
+CELLS = tuple(1 << cell for cell in range(9))
+
+# Minimax value for X of every board searched so far
+values = {}
+
+
+def initial_state():
+    """
+    Returns starting state of the board.
+    """
+    return (0, 0)
+
+
+def player(board):
+    """
+    Returns player who has the next turn on a board.
+    """
+    x, o = board
+    return X if COUNTS[x] == COUNTS[o] else O
+
+
+def actions(board):
+    """
+    Returns set of all possible actions (i, j) available on the board.
+    """
+    x, o = board
+    taken = x | o
+    return {divmod(cell, 3) for cell in range(9) if not taken & CELLS[cell]}
+
+
+def result(board, action):
+    """
+    Returns the board that results from making move (i, j) on the board.
+    """
+    x, o = board
+    i, j = action
+    if not (0 <= i < 3 and 0 <= j < 3) or (x | o) & CELLS[3 * i + j]:
+        raise NameError('Invalid move')
+    return play(board, CELLS[3 * i + j])
+
+
+def play(board, bit):
+    """
+    Returns the board after the player to move takes the cell `bit`.
+    """
+    x, o = board
+    if COUNTS[x] == COUNTS[o]:
+        return (x | bit, o)
+    return (x, o | bit)
+
+
+def winner(board):
+    """
+    Returns the winner of the game, if there is one.
+    """
+    x, o = board
+    if WINNING[x]:
+        return X
+    if WINNING[o]:
+        return O
+    return None
+
+
+def terminal(board):
+    """
+    Returns True if game is over, False otherwise.
+    """
+    x, o = board
+    return WINNING[x] or WINNING[o] or (x | o) == FULL
+
+
+def utility(board):
+    """
+    Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+    """
+    x, o = board
+    if WINNING[x]:
+        return 1
+    if WINNING[o]:
+        return -1
+    return 0
+
+
+def value(board):
+    """
+    Returns the minimax value of a board for X, memoized in `values`.
+    """
+    if board in values:
+        return values[board]
+    if terminal(board):
+        v = utility(board)
+    else:
+        x, o = board
+        taken = x | o
+        children = [value(play(board, bit)) for bit in CELLS
+                    if not taken & bit]
+        v = max(children) if COUNTS[x] == COUNTS[o] else min(children)
+    values[board] = v
+    return v
+
+
+def minimax(board):
+    """
+    Returns the optimal action for the current player on the board.
+    """
+    if terminal(board):
+        return None
+    x, o = board
+    choose = max if COUNTS[x] == COUNTS[o] else min
+    return choose(sorted(actions(board)),
+                  key=lambda action: value(result(board, action)))
+
+
+def from_board(board):
+    """
+    Returns the bitboard for a board of nested lists, as used by runner.py.
+    """
+    x = o = 0
+    for i in range(3):
+        for j in range(3):
+            if board[i][j] == X:
+                x |= CELLS[3 * i + j]
+            elif board[i][j] == O:
+                o |= CELLS[3 * i + j]
+    return (x, o)
+
+
+def to_board(state):
+    """
+    Returns the board of nested lists, as used by runner.py, for a bitboard.
+    """
+    x, o = state
+    return [[X if x & CELLS[3 * i + j] else O if o & CELLS[3 * i + j]
+             else EMPTY for j in range(3)] for i in range(3)]
@@ -0,0 +1,80 @@
+"""
+Tic Tac Toe opening book
+
+Solves every reachable position once, up to rotations and reflections,
+and writes the best move of each to the book that minimax reads.
+"""
+
+import argparse
+import sys
+import time
+from array import array
+
+import tictactoe as ttt
+
+
+def positions():
+    """
+    Returns a dict mapping the position code of every reachable canonical
+    board where the game isn't over to that board.
+    """
+    found = {}
+    frontier = [ttt.initial_state()]
+    while frontier:
+        board = frontier.pop()
+        cells = ttt.canonical(board)
+        code = ttt.position_code(cells)
+        if code in found or ttt.terminal(board):
+            continue
+        found[code] = [[ttt.EMPTY if cell == 0 else ttt.X if cell == 1 else ttt.O
+                        for cell in cells[row:row + 3]] for row in (0, 3, 6)]
+        for action in ttt.actions(board):
+            frontier.append(ttt.result(board, action))
+    return found
+
+
+def solve(boards):
+    """
+    Returns a dict mapping each position code to the index of the best
+    cell on its board.
+    """
+    search = ttt.Search()
+    moves = {}
+    for code, board in boards.items():
+        i, j = search.best_move(board)
+        moves[code] = 3 * i + j
+    return moves
+
+
+def write_book(moves, path=ttt.BOOK_FILE):
+    """
+    Writes the best cells of positions to a book, in the format read by
+    tictactoe.read_book.
+    """
+    codes = array("H", sorted(moves))
+    cells = bytes(moves[code] for code in codes)
+    if sys.byteorder == "big":
+        codes.byteswap()
+    with open(path, "wb") as f:
+        f.write(ttt.BOOK_MAGIC)
+        f.write(codes.tobytes())
+        f.write(cells)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write the tic-tac-toe opening book.")
+    parser.add_argument("book", nargs="?", default=ttt.BOOK_FILE)
+    args = parser.parse_args()
+
+    start = time.time()
+    moves = solve(positions())
+    write_book(moves, args.book)
+    print(f"Solved {len(moves)} positions in {time.time() - start:.2f}s")
+
+    start = time.perf_counter()
+    ttt.read_book(args.book)
+    print(f"Book loads in {(time.perf_counter() - start) * 1000:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
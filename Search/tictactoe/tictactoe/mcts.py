@@ -0,0 +1,269 @@
+"""
+Monte Carlo tree search for m,n,k Tic Tac Toe
+
+Plays by UCT: the tree grows one node per playout, toward the moves
+whose random games have gone best so far, and the move played is the
+one tried most. Games are played on mnk bitboards, so the same player
+works on boards too large for exact search.
+"""
+
+import argparse
+import math
+import random
+import threading
+import time
+
+import bitboard
+import mnk
+import tictactoe as ttt
+
+# Weight of exploring rarely tried moves against exploiting good ones
+EXPLORATION = math.sqrt(2)
+
+
+class Node():
+    def __init__(self, state, parent, bit, moves):
+        self.state = state
+        self.parent = parent
+        self.bit = bit
+        self.children = []
+        self.untried = moves
+        self.visits = 0
+        # Playout score for the player who moved into this node: 1 per
+        # win and 1/2 per draw
+        self.score = 0.0
+
+
+class MCTS():
+    """
+    UCT player with a budget of playouts and/or seconds per move.
+
+    The tree under the chosen move is kept, and reused by the next call
+    if the state it is given follows from it within two moves.
+    """
+    def __init__(self, game, playouts=1000, budget=None, exploration=EXPLORATION, seed=None):
+        if playouts is None and budget is None:
+            raise ValueError("MCTS needs a playout or time budget")
+        self.game = game
+        self.playouts = playouts
+        self.budget = budget
+        self.exploration = exploration
+        self.rng = random.Random(seed)
+        self.root = None
+        self.played = 0
+        self.reused = 0
+
+    def best_move(self, state):
+        """
+        Returns the action with the most playouts after searching from a
+        state, or None if the game is over.
+        """
+        game = self.game
+        if game.terminal(state):
+            return None
+        root = self.find(state)
+        self.reused = root.visits
+        self.played = 0
+        deadline = None if self.budget is None else time.perf_counter() + self.budget
+        while True:
+            if self.playouts is not None and self.played >= self.playouts:
+                break
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            self.playout(root)
+            self.played += 1
+
+        best = max(root.children, key=lambda child: child.visits)
+        best.parent = None
+        self.root = best
+        return divmod(best.bit, game.width)
+
+    def find(self, state):
+        """
+        Returns the node for a state from the kept tree, or a new root.
+        """
+        key = state[:2]
+        if self.root is not None:
+            if self.root.state[:2] == key:
+                return self.root
+            for child in self.root.children:
+                if child.state[:2] == key:
+                    child.parent = None
+                    return child
+        return self.node(state, None, -1)
+
+    def node(self, state, parent, bit):
+        moves = [] if self.game.terminal(state) else self.game.moves(state)
+        self.rng.shuffle(moves)
+        return Node(state, parent, bit, moves)
+
+    def playout(self, root):
+        """
+        Runs one playout from the root: selects a leaf by UCT, expands it
+        by one untried move, plays a random game from there, and scores
+        the result back up the path.
+        """
+        node = root
+        while not node.untried and node.children:
+            node = self.select(node)
+        if node.untried:
+            bit = node.untried.pop()
+            child = self.node(self.game.play(node.state, bit), node, bit)
+            node.children.append(child)
+            node = child
+
+        winner = self.rollout(node.state)
+        while node is not None:
+            node.visits += 1
+            if winner is None:
+                node.score += 0.5
+            elif node.bit >= 0 and (node.state[0] >> node.bit & 1) == (winner == mnk.X):
+                node.score += 1
+            node = node.parent
+
+    def select(self, node):
+        """
+        Returns the child of a node with the highest upper confidence bound.
+        """
+        log_visits = math.log(node.visits)
+        exploration = self.exploration
+        return max(node.children, key=lambda child: (
+            child.score / child.visits
+            + exploration * math.sqrt(log_visits / child.visits)))
+
+    def rollout(self, state):
+        """
+        Returns the winner of a game played on from a state by uniformly
+        random moves, or None for a draw.
+        """
+        game = self.game
+        x, o, last = state
+        if last >= 0:
+            won = game.winner(state)
+            if won is not None or (x | o) == game.full:
+                return won
+        # Dealing the free cells out in a shuffled order plays the same
+        # random game as drawing each move afresh, without rebuilding
+        # the list of moves after every one
+        taken = x | o
+        free = [bit for bit in game.bits if not taken >> bit & 1]
+        self.rng.shuffle(free)
+        x_to_move = x.bit_count() == o.bit_count()
+        for bit in free:
+            if x_to_move:
+                x |= 1 << bit
+                if game.completes_line(x, bit):
+                    return mnk.X
+            else:
+                o |= 1 << bit
+                if game.completes_line(o, bit):
+                    return mnk.O
+            x_to_move = not x_to_move
+        return None
+
+
+# The game on runner.py's board
+CLASSIC = mnk.Game(3, 3, 3)
+
+# Per-thread players used by minimax, with their trees
+players = threading.local()
+
+
+def default_player():
+    """
+    Returns the 3x3 player used by minimax on the current thread, created
+    on first use.
+    """
+    player = getattr(players, "player", None)
+    if player is None:
+        player = players.player = MCTS(CLASSIC)
+    return player
+
+
+def from_board(board):
+    """
+    Returns the mnk state for a 3x3 board of nested lists, as used by
+    runner.py.
+
+    The board doesn't say which move was last, so if either player has
+    a line, a cell of it stands in as the last move and the state is
+    seen as won.
+    """
+    x = o = 0
+    for i in range(3):
+        for j in range(3):
+            if board[i][j] == ttt.X:
+                x |= 1 << (4 * i + j)
+            elif board[i][j] == ttt.O:
+                o |= 1 << (4 * i + j)
+    for cells in (x, o):
+        for bit in CLASSIC.bits:
+            if cells >> bit & 1 and CLASSIC.completes_line(cells, bit):
+                return (x, o, bit)
+    return (x, o, -1)
+
+
+def minimax(board):
+    """
+    Returns the action chosen by MCTS for the current player on a board
+    of nested lists, as a drop-in for tictactoe.minimax.
+    """
+    return default_player().best_move(from_board(board))
+
+
+def positions():
+    """
+    Returns every reachable 3x3 board where the game isn't over.
+    """
+    found = {}
+    frontier = [bitboard.initial_state()]
+    while frontier:
+        state = frontier.pop()
+        if state in found or bitboard.terminal(state):
+            continue
+        found[state] = bitboard.to_board(state)
+        frontier.extend(bitboard.result(state, action) for action in bitboard.actions(state))
+    return list(found.values())
+
+
+def benchmark(boards, choose):
+    """
+    Returns the fraction of boards on which `choose` picks an optimal
+    move and the number of moves it picks per second.
+    """
+    optimal = 0
+    start = time.perf_counter()
+    moves = [choose(board) for board in boards]
+    elapsed = time.perf_counter() - start
+    for board, move in zip(boards, moves):
+        state = bitboard.from_board(board)
+        if bitboard.value(bitboard.result(state, move)) == bitboard.value(state):
+            optimal += 1
+    return optimal / len(boards), len(boards) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare MCTS with exhaustive search on every 3x3 position.")
+    parser.add_argument("--playouts", type=int, nargs="+", default=[100, 300, 1000])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    boards = positions()
+    print(f"{len(boards)} positions")
+
+    def exhaustive(board):
+        return ttt.Search().best_move(board)
+
+    accuracy, speed = benchmark(boards, exhaustive)
+    print(f"exhaustive search: {accuracy:.1%} optimal, {speed:.0f} moves/sec")
+    for playouts in args.playouts:
+        def uct(board):
+            return MCTS(CLASSIC, playouts, seed=args.seed).best_move(from_board(board))
+
+        accuracy, speed = benchmark(boards, uct)
+        print(f"MCTS, {playouts} playouts: {accuracy:.1%} optimal, {speed:.0f} moves/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,327 @@
+"""
+m,n,k Tic Tac Toe
+
+Tic-tac-toe generalized to m rows, n columns and k in a row to win,
+such as 4x4 with k=4 or 15x15 gomoku with k=5, played by an iterative
+deepening alpha-beta search under a time budget per move.
+
+A state is a tuple (x, o, last) of one integer bitboard per player and
+the bit of the last move, or -1 before the first. Cell (i, j) is bit
+i * (n + 1) + j: the unused bit closing each row stops lines from
+running on into the next one.
+"""
+
+import argparse
+import math
+import time
+
+X = "X"
+O = "O"
+EMPTY = None
+
+# Score of a won game, from which the number of moves to reach it is
+# taken so that quicker wins are preferred
+WIN = 10 ** 9
+
+# Nodes searched between checks of the clock
+CLOCK_INTERVAL = 1024
+
+
+class TimeUp(Exception):
+    pass
+
+
+class Game():
+    """
+    The rules of the game on an m by n board with k in a row to win.
+
+    With radius set, moves are only considered within that many cells
+    of a stone already on the board, which keeps large boards tractable.
+    By default every cell is considered on boards of up to 25 cells.
+    """
+    def __init__(self, m=3, n=3, k=3, radius=-1):
+        if k > max(m, n):
+            raise ValueError(f"no line of {k} fits on a {m}x{n} board")
+        self.m = m
+        self.n = n
+        self.k = k
+        self.width = n + 1
+        self.radius = (None if m * n <= 25 else 2) if radius == -1 else radius
+        self.bits = [i * self.width + j for i in range(m) for j in range(n)]
+        self.full = sum(1 << bit for bit in self.bits)
+
+        # Bit steps along rows, columns and both diagonals
+        self.directions = (1, self.width, self.width + 1, self.width - 1)
+
+        # Masks of every run of k cells, for scanning whole boards
+        cell_set = set(self.bits)
+        self.windows = []
+        for bit in self.bits:
+            for step in self.directions:
+                cells = [bit + step * t for t in range(k)]
+                if all(cell in cell_set for cell in cells):
+                    self.windows.append(sum(1 << cell for cell in cells))
+
+        # Center out, so searches look at the strongest cells first
+        center_i, center_j = (m - 1) / 2, (n - 1) / 2
+        self.order = sorted(self.bits, key=lambda bit: (
+            abs(bit // self.width - center_i) + abs(bit % self.width - center_j), bit))
+
+    def initial_state(self):
+        """
+        Returns starting state of the board.
+        """
+        return (0, 0, -1)
+
+    def player(self, state):
+        """
+        Returns player who has the next turn in a state.
+        """
+        x, o, _ = state
+        return X if x.bit_count() == o.bit_count() else O
+
+    def actions(self, state):
+        """
+        Returns the actions (i, j) considered in a state, center first.
+        """
+        return [divmod(bit, self.width) for bit in self.moves(state)]
+
+    def moves(self, state):
+        """
+        Returns the bits of the cells considered in a state, center first.
+        """
+        x, o, _ = state
+        occupied = x | o
+        if self.radius is None:
+            near = self.full
+        elif not occupied:
+            return self.order[:1]
+        else:
+            near = occupied
+            for _ in range(self.radius):
+                grown = near
+                for step in self.directions:
+                    grown |= near << step | near >> step
+                near = grown & self.full
+        near &= ~occupied
+        return [bit for bit in self.order if near >> bit & 1]
+
+    def result(self, state, action):
+        """
+        Returns the state that results from making move (i, j) in a state.
+        """
+        i, j = action
+        bit = i * self.width + j
+        x, o, _ = state
+        if not (0 <= i < self.m and 0 <= j < self.n) or (x | o) >> bit & 1:
+            raise NameError('Invalid move')
+        return self.play(state, bit)
+
+    def play(self, state, bit):
+        """
+        Returns the state after the player to move takes a cell bit.
+        """
+        x, o, _ = state
+        if x.bit_count() == o.bit_count():
+            return (x | 1 << bit, o, bit)
+        return (x, o | 1 << bit, bit)
+
+    def completes_line(self, cells, bit):
+        """
+        Returns True if the cell bit is part of k in a row among the cells,
+        walking out from it along each direction.
+        """
+        for step in self.directions:
+            count = 1
+            cell = bit - step
+            while count < self.k and cell >= 0 and cells >> cell & 1:
+                count += 1
+                cell -= step
+            cell = bit + step
+            while count < self.k and cells >> cell & 1:
+                count += 1
+                cell += step
+            if count >= self.k:
+                return True
+        return False
+
+    def winner(self, state):
+        """
+        Returns the winner of the game, if there is one. Only the lines
+        through the last move are checked, since any earlier win would
+        have ended the game.
+        """
+        x, o, last = state
+        if last < 0:
+            return None
+        if x >> last & 1:
+            return X if self.completes_line(x, last) else None
+        return O if self.completes_line(o, last) else None
+
+    def terminal(self, state):
+        """
+        Returns True if game is over, False otherwise.
+        """
+        x, o, _ = state
+        return (x | o) == self.full or self.winner(state) is not None
+
+    def utility(self, state):
+        """
+        Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+        """
+        won = self.winner(state)
+        return 1 if won == X else -1 if won == O else 0
+
+    def render(self, state):
+        """
+        Returns the board of a state as text, one line per row.
+        """
+        x, o, _ = state
+        return "\n".join(
+            " ".join("X" if x >> bit & 1 else "O" if o >> bit & 1 else "."
+                     for bit in range(i * self.width, i * self.width + self.n))
+            for i in range(self.m)
+        )
+
+
+def line_heuristic(game, state):
+    """
+    Returns an estimate of a state's value for X: every run of k cells
+    still open to only one player counts for them, weighted tenfold for
+    each stone they already have in it.
+    """
+    x, o, _ = state
+    score = 0
+    for window in game.windows:
+        xs = x & window
+        os = o & window
+        if xs and not os:
+            score += 10 ** xs.bit_count()
+        elif os and not xs:
+            score -= 10 ** os.bit_count()
+    return score
+
+
+class Search():
+    """
+    Iterative deepening alpha-beta negamax search with a wall-clock
+    budget per move and a pluggable heuristic for positions at the
+    depth limit.
+
+    The heuristic is called with the game and a state and returns a
+    score for X, which should stay well below WIN in magnitude.
+    """
+    def __init__(self, game, heuristic=line_heuristic, budget=1.0, max_depth=None):
+        self.game = game
+        self.heuristic = heuristic
+        self.budget = budget
+        self.max_depth = max_depth
+        self.best = {}
+        self.deadline = None
+        self.nodes = 0
+        self.depth = 0
+        self.value = None
+
+    def best_move(self, state):
+        """
+        Returns the best action found in a state within the time budget,
+        or None if the game is over. Each deeper search starts from the
+        best move of the last, and a search cut off by the clock is
+        abandoned in favour of the last completed one.
+        """
+        game = self.game
+        if game.terminal(state):
+            return None
+        self.nodes = 0
+        self.depth = 0
+        self.deadline = time.perf_counter() + self.budget
+        moves = game.moves(state)
+        move = moves[0]
+        limit = (game.full & ~(state[0] | state[1])).bit_count()
+        if self.max_depth is not None:
+            limit = min(limit, self.max_depth)
+        for depth in range(1, limit + 1):
+            try:
+                value, bit = self.root(state, moves, depth)
+            except TimeUp:
+                break
+            move, self.value, self.depth = bit, value, depth
+            moves.remove(bit)
+            moves.insert(0, bit)
+            if abs(value) >= WIN - depth:
+                break
+        return divmod(move, game.width)
+
+    def root(self, state, moves, depth):
+        """
+        Returns the value and bit of the best of the moves in a state,
+        searched to depth.
+        """
+        alpha, beta = -math.inf, math.inf
+        best = None
+        for bit in moves:
+            value = -self.negamax(self.game.play(state, bit), depth - 1, -beta, -alpha, 1)
+            if best is None or value > alpha:
+                best, alpha = bit, value
+        return alpha, best
+
+    def negamax(self, state, depth, alpha, beta, ply):
+        """
+        Returns the value of a state for the player to move, searched to
+        depth within the window (alpha, beta), ply moves below the root.
+        """
+        self.nodes += 1
+        if self.nodes % CLOCK_INTERVAL == 0 and time.perf_counter() > self.deadline:
+            raise TimeUp
+        game = self.game
+        x, o, last = state
+        # The player who just moved is the only one who can have won
+        if last >= 0 and game.completes_line(x if x >> last & 1 else o, last):
+            return ply - WIN
+        if (x | o) == game.full:
+            return 0
+        if depth == 0:
+            value = self.heuristic(game, state)
+            return value if x.bit_count() == o.bit_count() else -value
+
+        key = (x, o)
+        moves = game.moves(state)
+        known = self.best.get(key)
+        if known is not None:
+            moves.remove(known)
+            moves.insert(0, known)
+        value = -math.inf
+        for bit in moves:
+            score = -self.negamax(game.play(state, bit), depth - 1, -beta, -alpha, ply + 1)
+            if score > value:
+                value = score
+                self.best[key] = bit
+            if value >= beta:
+                break
+            alpha = max(alpha, value)
+        return value
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play m,n,k tic-tac-toe engine against itself.")
+    parser.add_argument("m", type=int, nargs="?", default=3, help="rows")
+    parser.add_argument("n", type=int, nargs="?", default=3, help="columns")
+    parser.add_argument("k", type=int, nargs="?", default=3, help="in a row to win")
+    parser.add_argument("--budget", type=float, default=1.0, help="seconds per move")
+    args = parser.parse_args()
+
+    game = Game(args.m, args.n, args.k)
+    search = Search(game, budget=args.budget)
+    state = game.initial_state()
+    while not game.terminal(state):
+        move = search.best_move(state)
+        print(f"{game.player(state)} plays {move}: depth {search.depth}, "
+              f"{search.nodes} nodes, value {search.value}")
+        state = game.result(state, move)
+    print(game.render(state))
+    won = game.winner(state)
+    print(f"Winner: {won}" if won else "Draw")
+
+
+if __name__ == "__main__":
+    main()
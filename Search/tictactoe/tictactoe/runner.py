@@ -1,9 +1,36 @@
 import pygame
 import sys
+import threading
 import time
 
 import tictactoe as ttt
 
+
+class Thinker():
+    """
+    Computes the computer's move on a background thread, so the window
+    keeps drawing while it searches.
+    """
+    def __init__(self, board):
+        self.started = time.time()
+        self.move = None
+        self.stop = threading.Event()
+        self.thread = threading.Thread(target=self.run, args=(board,), daemon=True)
+        self.thread.start()
+
+    def run(self, board):
+        try:
+            self.move = ttt.minimax(board, self.stop)
+        except ttt.SearchCancelled:
+            pass
+
+    def ready(self):
+        return not self.thread.is_alive()
+
+    def cancel(self):
+        self.stop.set()
+
+
 pygame.init()
 size = width, height = 600, 400
 
@@ -17,16 +44,28 @@ mediumFont = pygame.font.Font("OpenSans-Regular.ttf", 28)
 largeFont = pygame.font.Font("OpenSans-Regular.ttf", 40)
 moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
 
+clock = pygame.time.Clock()
+
 user = None
 board = ttt.initial_state()
-ai_turn = False
+thinker = None
 
 while True:
 
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
+            if thinker is not None:
+                thinker.cancel()
             sys.exit()
 
+        # Escape abandons the game, even while the computer is thinking
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+            if thinker is not None:
+                thinker.cancel()
+                thinker = None
+            user = None
+            board = ttt.initial_state()
+
     screen.fill(black)
 
     # Let user choose a player.
@@ -102,21 +141,21 @@ while True:
         elif user == player:
             title = f"Play as {user}"
         else:
-            title = f"Computer thinking..."
+            dots = int(time.time() * 2) % 3 + 1
+            title = f"Computer thinking" + "." * dots
         title = largeFont.render(title, True, white)
         titleRect = title.get_rect()
         titleRect.center = ((width / 2), 30)
         screen.blit(title, titleRect)
 
-        # Check for AI move
+        # Check for AI move, shown no sooner than half a second after
+        # it was asked for
         if user != player and not game_over:
-            if ai_turn:
-                time.sleep(0.5)
-                move = ttt.minimax(board)
-                board = ttt.result(board, move)
-                ai_turn = False
-            else:
-                ai_turn = True
+            if thinker is None:
+                thinker = Thinker(board)
+            elif thinker.ready() and time.time() - thinker.started >= 0.5:
+                board = ttt.result(board, thinker.move)
+                thinker = None
 
         # Check for a user move
         click, _, _ = pygame.mouse.get_pressed()
@@ -141,6 +180,6 @@ while True:
                     time.sleep(0.2)
                     user = None
                     board = ttt.initial_state()
-                    ai_turn = False
 
     pygame.display.flip()
+    clock.tick(60)
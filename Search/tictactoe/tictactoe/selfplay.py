@@ -0,0 +1,191 @@
+"""
+Headless Tic Tac Toe
+
+Plays engines against each other or against random moves in a process
+pool, or finds the engine's moves for a file of boards, and reports
+throughput and per-move latency without needing a display.
+
+Boards in files are one per line, nine cells read row by row as X, O
+or . for empty; spaces and slashes between cells are ignored.
+"""
+
+import argparse
+import multiprocessing
+import random
+import statistics
+import sys
+import time
+
+import tictactoe as ttt
+
+ttt.VERBOSE = False
+
+
+def random_move(board, rng):
+    """
+    Returns a uniformly random action on the board.
+    """
+    return rng.choice(sorted(ttt.actions(board)))
+
+
+def search_move(board, rng):
+    """
+    Returns the action found by searching, ignoring the opening book.
+    """
+    return ttt.default_search().best_move(board)
+
+
+def minimax_move(board, rng):
+    """
+    Returns the action chosen by minimax, from the opening book if it has one.
+    """
+    return ttt.minimax(board)
+
+
+# Players by name, each called with a board and a random number generator
+PLAYERS = {
+    "minimax": minimax_move,
+    "search": search_move,
+    "random": random_move,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play or evaluate tic-tac-toe without a display.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    play = commands.add_parser("play", help="play games and report throughput")
+    play.add_argument("--games", type=int, default=100)
+    play.add_argument("--x", choices=PLAYERS, default="minimax", help="player for X")
+    play.add_argument("--o", choices=PLAYERS, default="random", help="player for O")
+    play.add_argument("--workers", type=int, default=1,
+                      help="number of processes to play with")
+    play.add_argument("--seed", type=int, default=0)
+
+    evaluate = commands.add_parser("evaluate", help="find the move for each board in a file")
+    evaluate.add_argument("boards", help="file of boards, one per line")
+    evaluate.add_argument("--player", choices=PLAYERS, default="minimax")
+    evaluate.add_argument("--output", help="output file (default: stdout)")
+    args = parser.parse_args()
+
+    if args.command == "play":
+        start = time.perf_counter()
+        outcomes, latencies = play_games(args.games, args.x, args.o, args.workers, args.seed)
+        elapsed = time.perf_counter() - start
+        print(f"{args.games} games in {elapsed:.2f}s, "
+              f"{args.games / elapsed:.1f} games/sec")
+        print(", ".join(f"{name}: {outcomes[name]}" for name in ("X", "O", "draw")))
+        for name, times in latencies.items():
+            print(f"{name} move latency: {describe(times)}")
+    else:
+        try:
+            boards = read_boards(args.boards)
+        except ValueError as e:
+            sys.exit(str(e))
+        moves, times = evaluate_boards(boards, args.player)
+        if args.output is None:
+            write_moves(boards, moves, sys.stdout)
+        else:
+            with open(args.output, "w", encoding="utf-8") as f:
+                write_moves(boards, moves, f)
+        print(f"{len(boards)} boards, move latency: {describe(times)}", file=sys.stderr)
+
+
+def play_games(games, x_player, o_player, workers=1, seed=0):
+    """
+    Plays games between two players, each game seeded from `seed` and
+    its number, spread over a process pool when `workers` > 1.
+
+    Returns the number of X wins, O wins and draws, and the latencies of
+    every move in seconds, by player name.
+    """
+    tasks = [(x_player, o_player, seed + game) for game in range(games)]
+    if workers > 1:
+        with multiprocessing.Pool(workers) as pool:
+            results = pool.map(play_game, tasks, chunksize=max(1, games // (4 * workers)))
+    else:
+        results = map(play_game, tasks)
+
+    outcomes = {"X": 0, "O": 0, "draw": 0}
+    latencies = {x_player: [], o_player: []}
+    for winner, x_times, o_times in results:
+        outcomes[winner or "draw"] += 1
+        latencies[x_player].extend(x_times)
+        latencies[o_player].extend(o_times)
+    return outcomes, latencies
+
+
+def play_game(task):
+    """
+    Returns the winner of one game, or None for a draw, with the move
+    latencies of X and of O.
+    """
+    x_player, o_player, seed = task
+    rng = random.Random(seed)
+    players = {ttt.X: PLAYERS[x_player], ttt.O: PLAYERS[o_player]}
+    times = {ttt.X: [], ttt.O: []}
+    board = ttt.initial_state()
+    while not ttt.terminal(board):
+        turn = ttt.player(board)
+        start = time.perf_counter()
+        move = players[turn](board, rng)
+        times[turn].append(time.perf_counter() - start)
+        board = ttt.result(board, move)
+    return ttt.winner(board), times[ttt.X], times[ttt.O]
+
+
+def evaluate_boards(boards, player="minimax"):
+    """
+    Returns a player's move on each board, None where the game is over,
+    along with the time each move took in seconds.
+    """
+    rng = random.Random(0)
+    choose = PLAYERS[player]
+    moves, times = [], []
+    for board in boards:
+        start = time.perf_counter()
+        moves.append(None if ttt.terminal(board) else choose(board, rng))
+        times.append(time.perf_counter() - start)
+    return moves, times
+
+
+def read_boards(filename):
+    """
+    Returns the boards in a file, skipping blank lines.
+    """
+    cells = {"X": ttt.X, "O": ttt.O, ".": ttt.EMPTY}
+    boards = []
+    with open(filename, encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            text = line.strip().replace(" ", "").replace("/", "").upper()
+            if not text:
+                continue
+            if len(text) != 9 or any(cell not in cells for cell in text):
+                raise ValueError(f"{filename}:{number}: not a board: {line.strip()}")
+            boards.append([[cells[cell] for cell in text[row:row + 3]] for row in (0, 3, 6)])
+    return boards
+
+
+def write_moves(boards, moves, f):
+    """
+    Writes each board with its move as "i,j", or "-" if the game is over.
+    """
+    for board, move in zip(boards, moves):
+        text = "".join(cell or "." for row in board for cell in row)
+        f.write(f"{text} {'-' if move is None else f'{move[0]},{move[1]}'}\n")
+
+
+def describe(times):
+    """
+    Returns a summary of latencies in seconds, in milliseconds.
+    """
+    if not times:
+        return "no moves"
+    ms = sorted(t * 1000 for t in times)
+    p50, p90, p99 = (ms[min(len(ms) - 1, int(q * len(ms)))] for q in (0.5, 0.9, 0.99))
+    return (f"{len(ms)} moves, mean {statistics.fmean(ms):.3f}ms, p50 {p50:.3f}ms, "
+            f"p90 {p90:.3f}ms, p99 {p99:.3f}ms, max {ms[-1]:.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,17 +4,53 @@ Tic Tac Toe Player
 
 import math
 import copy
+import os
 import random
+import sys
+import threading
 import time
+from array import array
 
 X = "X"
 O = "O"
 EMPTY = None
-AI=None
-x={}
-original=None
-best=None
-least=None
+
+# Bound types of transposition table values
+EXACT = "exact"
+LOWER = "lower"
+UPPER = "upper"
+
+# Center, then corners, then edges
+MOVE_ORDER = ((1, 1), (0, 0), (0, 2), (2, 0), (2, 2), (0, 1), (1, 0), (1, 2), (2, 1))
+
+# Whether minimax prints its timing and move scores
+VERBOSE = True
+
+# Per-thread searches used by minimax
+searches = threading.local()
+
+# Opening book written by book.py, next to this file
+BOOK_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tictactoe.book")
+BOOK_MAGIC = b"TTTB\x01"
+
+# Best cell of every canonical position, loaded from the book on first use
+book = None
+
+CELL_CODES = {EMPTY: 0, X: 1, O: 2}
+
+# Cell orders of the eight rotations and reflections of a flattened board
+SYMMETRIES = (
+    (0, 1, 2, 3, 4, 5, 6, 7, 8),
+    (6, 3, 0, 7, 4, 1, 8, 5, 2),
+    (8, 7, 6, 5, 4, 3, 2, 1, 0),
+    (2, 5, 8, 1, 4, 7, 0, 3, 6),
+    (2, 1, 0, 5, 4, 3, 8, 7, 6),
+    (6, 7, 8, 3, 4, 5, 0, 1, 2),
+    (0, 3, 6, 1, 4, 7, 2, 5, 8),
+    (8, 5, 2, 7, 4, 1, 6, 3, 0),
+)
+
+
 def initial_state():
     """
     Returns starting state of the board.
@@ -106,69 +142,230 @@ def utility(board):
     else:return 0
 
 
-def MAX_VALUE(board):
-    global x
-    global best
-    global least
-    if terminal(board):
-        return utility(board)
-    v=-math.inf
-    for action in actions(board):
-        j=MIN_VALUE(result(board,action))
-        if original==board and best==None: best=j
-        if least!=None and j>least:
-            return j
-        v = max(v,j)
-        # the upcoming line checks if the layer is upper layer
-        if board==original and j>=best:
-            x[action]= j
-            best=j
-    return v
-
-def MIN_VALUE(board):
-    global x
-    global best
-    global least
-    if terminal(board):
-        return utility(board)
-    v=math.inf
-    for action in actions(board):
-        j=MAX_VALUE(result(board,action))
-        if original==board and least==None: least=j
-        if best!=None and j<best :
-            return j
-        v = min(v,j)
-        # the upcoming line checks if the layer is upper layer
-        if board==original and j<=least:
-            x[action]= j
-            least=j
-    return v
-
-
-def minimax(board):
+def canonical(board):
+    """
+    Returns a key shared by a board and all its rotations and reflections:
+    the smallest of its eight symmetric cell tuples.
+    """
+    return orient(board)[0]
+
+
+def orient(board):
+    """
+    Returns the canonical cells of a board along with the symmetry that
+    produces them, where canonical cell k is board cell symmetry[k].
+    """
+    cells = tuple(CELL_CODES[cell] for row in board for cell in row)
+    return min((tuple(cells[i] for i in symmetry), symmetry) for symmetry in SYMMETRIES)
+
+
+def position_code(cells):
+    """
+    Returns the cells of a flattened board read as a base 3 number.
+    """
+    code = 0
+    for cell in cells:
+        code = 3 * code + cell
+    return code
+
+
+def read_book(path=BOOK_FILE):
+    """
+    Returns a dict mapping the position code of each canonical board in
+    the book to the index of its best cell, or None if there's no book.
+
+    The book is its magic bytes followed by the little-endian 16-bit
+    codes of its positions and then one cell index byte per position.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+    if not data.startswith(BOOK_MAGIC):
+        raise ValueError(f"{path} is not a tic-tac-toe book")
+    count = (len(data) - len(BOOK_MAGIC)) // 3
+    codes = array("H")
+    codes.frombytes(data[len(BOOK_MAGIC):len(BOOK_MAGIC) + 2 * count])
+    if sys.byteorder == "big":
+        codes.byteswap()
+    return dict(zip(codes, data[len(BOOK_MAGIC) + 2 * count:]))
+
+
+def book_move(board):
+    """
+    Returns the best action on the board from the opening book, or None
+    if the book is missing or doesn't hold the board.
+    """
+    global book
+    if book is None:
+        book = read_book() or {}
+    if not book:
+        return None
+    cells, symmetry = orient(board)
+    cell = book.get(position_code(cells))
+    if cell is None:
+        return None
+    return divmod(symmetry[cell], 3)
+
+
+class SearchCancelled(Exception):
+    pass
+
+
+class Search():
+    """
+    Alpha-beta negamax search holding its own transposition table and
+    counters, so separate games can be searched from separate threads.
+
+    Several searches may share one transposition table: its values only
+    depend on the position, and single dict reads and writes are atomic.
+    """
+    def __init__(self, transpositions=None):
+        self.transpositions = {} if transpositions is None else transpositions
+        self.nodes = 0
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+        self.scores = {}
+        self.stop = None
+
+    def best_move(self, board, stop=None):
+        """
+        Returns the optimal action for the current player on the board,
+        or None if the game is over.
+
+        Raises SearchCancelled if the threading.Event `stop` is set before
+        the search finishes.
+        """
+        self.nodes = 0
+        self.scores = {}
+        self.stop = stop
+        if terminal(board):
+            return None
+        board = [list(row) for row in board]
+        turn = player(board)
+        color = 1 if turn == X else -1
+        alpha, beta = -math.inf, math.inf
+        move = None
+        for action in ordered_actions(board):
+            i, j = action
+            board[i][j] = turn
+            value = -self.negamax(board, -beta, -alpha, -color)
+            board[i][j] = EMPTY
+            # Moves that cannot beat the best so far only have bounds
+            if move is None or value > alpha:
+                move, alpha = action, value
+                self.scores[action] = color * value
+        return move
+
+    def negamax(self, board, alpha, beta, color):
+        """
+        Returns the value of the board for the player to move, who is X
+        when color is 1 and O when it is -1, searched within the window
+        (alpha, beta). The board is modified in place and restored.
+        """
+        self.nodes += 1
+        if self.stop is not None and self.stop.is_set():
+            raise SearchCancelled
+        if terminal(board):
+            return color * utility(board)
+        key = canonical(board)
+        value = self.probe(key, alpha, beta)
+        if value is not None:
+            return value
+        window = (alpha, beta)
+        turn = X if color == 1 else O
+        value = -math.inf
+        for i, j in ordered_actions(board):
+            board[i][j] = turn
+            value = max(value, -self.negamax(board, -beta, -alpha, -color))
+            board[i][j] = EMPTY
+            if value >= beta:
+                break
+            alpha = max(alpha, value)
+        self.store(key, value, *window)
+        return value
+
+    def probe(self, key, alpha, beta):
+        """
+        Looks a canonical board up in the transposition table.
+
+        Returns its stored value if that settles the search within the
+        (alpha, beta) window, or None otherwise.
+        """
+        self.probes += 1
+        entry = self.transpositions.get(key)
+        if entry is None:
+            return None
+        value, bound = entry
+        if (bound == EXACT or (bound == LOWER and value >= beta)
+                or (bound == UPPER and value <= alpha)):
+            self.hits += 1
+            return value
+        return None
+
+    def store(self, key, value, alpha, beta):
+        """
+        Stores a value searched within the (alpha, beta) window, along with
+        whether it is exact or only a bound.
+        """
+        if value <= alpha:
+            bound = UPPER
+        elif value >= beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+        self.transpositions[key] = (value, bound)
+        self.stores += 1
+
+    def hit_rate(self):
+        """
+        Returns the fraction of transposition table probes that were hits.
+        """
+        return self.hits / self.probes if self.probes else 0
+
+
+def ordered_actions(board):
+    """
+    Returns the actions available on the board, center first, then
+    corners, then edges, which tends to find cutoffs soonest.
+    """
+    return [action for action in MOVE_ORDER if board[action[0]][action[1]] == EMPTY]
+
+
+def default_search():
+    """
+    Returns the search used by minimax on the current thread, created on
+    first use so each thread keeps its own.
+    """
+    search = getattr(searches, "search", None)
+    if search is None:
+        search = searches.search = Search()
+    return search
+
+
+def minimax(board, stop=None):
     """
     Returns the optimal action for the current player on the board.
+
+    Raises SearchCancelled if the threading.Event `stop` is set before a
+    search finishes.
     """
     start=time.time()
-    global original
-    global AI
-    global best
-    global least
-    #we must make global AI before it because we will alter AI and use it , therefore global AI is a must
-    #if we just want to print AI, then we could neglect typing 'global AI'
-    x.clear()
-    best=None
-    least=None
-    AI=player(board)
-    print(AI)
-    if terminal(board):return None
-    original=board
-    V=MIN_VALUE(board) if AI=='O' else MAX_VALUE(board)
-    end=time.time()
-    print(end-start)
-    print(x)
-    for key,value in x.items():
-        if value==V:
-            x.clear()
-            print(key)
-            return key
+    move = book_move(board)
+    search = None
+    if move is None:
+        search = default_search()
+        move = search.best_move(board, stop)
+    if VERBOSE:
+        end=time.time()
+        print(player(board))
+        if search is None:
+            print("book move")
+        else:
+            print(search.scores)
+            print(f"{search.nodes} nodes, transposition hit rate: {search.hit_rate():.2f}")
+        print(end-start)
+        print(move)
+    return move